@@ -21,6 +21,9 @@ class TaskCreate(BaseModel):
     tags: Optional[List[str]] = None
     due_date: Optional[str] = None
 
+class BatchSchedule(BaseModel):
+    tasks: List[TaskCreate]
+
 class FeedbackSubmit(BaseModel):
     task_id: str
     rating: int
@@ -59,7 +62,7 @@ async def root():
     }
 
 @app.post("/schedule/task")
-async def schedule_task(task: TaskCreate):
+def schedule_task(task: TaskCreate):
     """Agenda uma nova tarefa com IA"""
     try:
         task_data = task.model_dump()
@@ -76,7 +79,9 @@ async def schedule_task(task: TaskCreate):
             "scheduled_time": result.get('suggestion', {}).get('scheduled_datetime'),
             "confidence": result.get('confidence'),
             "reasoning": result.get('reasoning'),
-            "alternatives": result.get('alternatives', [])
+            "alternatives": result.get('alternatives', []),
+            "notion_status": result.get('notion_status'),
+            "degraded": result.get('suggestion', {}).get('degraded', False)
         }
         
     except ValueError as e:
@@ -96,6 +101,72 @@ async def schedule_task(task: TaskCreate):
         print(f"⚠️ Erro inesperado [{error_type}]: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor [{error_type}]")
 
+@app.post("/schedule/batch")
+def schedule_batch(batch: BatchSchedule):
+    """Agenda várias tarefas de uma vez (contexto único, colocação conjunta, escrita em lote)"""
+    try:
+        if not chronos:
+            raise HTTPException(status_code=500, detail="CHRONOS não foi inicializado corretamente")
+        
+        max_tasks = int(os.getenv('SCHEDULE_BATCH_MAX', '200'))
+        if not batch.tasks or len(batch.tasks) > max_tasks:
+            raise ValueError(f"o lote deve ter entre 1 e {max_tasks} tarefas")
+        
+        result = chronos.orchestrate_batch([task.model_dump() for task in batch.tasks])
+        
+        return {
+            "success": True,
+            "count": len(result['results']),
+            "tasks": [
+                {
+                    "title": item['task'].get('title'),
+                    "task_id": item['suggestion'].get('task_id'),
+                    "scheduled_time": item['suggestion'].get('scheduled_datetime'),
+                    "confidence": item['suggestion'].get('confidence', 0.5),
+                    "reasoning": item['suggestion'].get('reasoning', ''),
+                    "alternatives": item['suggestion'].get('alternatives', []),
+                    "degraded": item['suggestion'].get('degraded', False)
+                } for item in result['results']
+            ],
+            "notion_status": result['notion_status']
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        print(f"📋 Lote inválido recebido: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Lote de tarefas inválido: {str(e)}")
+    except ConnectionError as e:
+        print(f"🔌 Erro de conectividade: {str(e)}")
+        raise HTTPException(status_code=503, detail="Serviços externos indisponíveis")
+    except TimeoutError as e:
+        print(f"⏱️ Timeout na operação: {str(e)}")
+        raise HTTPException(status_code=504, detail="Timeout ao processar requisição")
+    except Exception as e:
+        error_type = type(e).__name__
+        print(f"⚠️ Erro inesperado [{error_type}]: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro interno do servidor [{error_type}]")
+
+@app.get("/schedule/task/{task_id}/notion")
+async def get_task_notion_status(task_id: str):
+    """Consulta o status da escrita da tarefa no Notion (page id quando concluída)"""
+    if not chronos:
+        raise HTTPException(status_code=500, detail="CHRONOS não foi inicializado corretamente")
+    
+    status = chronos.get_notion_status(task_id)
+    if not status:
+        raise HTTPException(status_code=404, detail=f"Tarefa '{task_id}' não encontrada no outbox")
+    
+    return {
+        "success": True,
+        "task_id": task_id,
+        "notion_status": status['status'],
+        "notion_task_id": status['notion_page_id'],
+        "attempts": status['attempts'],
+        "last_error": status['last_error'],
+        "pending_updates": status['pending_updates']
+    }
+
 @app.post("/feedback/submit")
 async def submit_feedback(feedback: FeedbackSubmit, background_tasks: BackgroundTasks):
     """Submete feedback do usuário"""
@@ -115,7 +186,7 @@ async def submit_feedback(feedback: FeedbackSubmit, background_tasks: Background
         raise HTTPException(status_code=500, detail=f"Erro ao processar feedback: {str(e)}")
 
 @app.get("/schedule/optimize/{date}")
-async def optimize_daily_schedule(date: str):
+def optimize_daily_schedule(date: str):
     """Otimiza cronograma de um dia específico"""
     try:
         # Verificar se chronos foi inicializado
@@ -123,7 +194,8 @@ async def optimize_daily_schedule(date: str):
             raise HTTPException(status_code=500, detail="CHRONOS não foi inicializado corretamente")
         
         target_date = datetime.fromisoformat(date)
-        optimization = chronos.ai.optimize_daily_schedule([], {})
+        tasks = chronos.get_tasks_for_date(target_date.date())
+        optimization = chronos.ai.optimize_daily_schedule(tasks, {})
         
         return {
             "success": True,
@@ -177,10 +249,54 @@ async def get_performance_analytics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro em analytics: {str(e)}")
 
+@app.get("/metrics/ai")
+async def get_ai_metrics():
+    """Métricas do cliente de IA: cache de sugestões e latência do LocalAI"""
+    if not chronos:
+        raise HTTPException(status_code=500, detail="CHRONOS não foi inicializado corretamente")
+
+    return {
+        "success": True,
+        "dev_mode": chronos.ai.dev_mode,
+        "cache": chronos.ai.get_cache_stats(),
+        "batching": chronos.ai.get_batch_stats(),
+        "hedge": chronos.ai.get_hedge_stats(),
+        "warmup": chronos.ai.get_warmup_stats(),
+        "endpoints": chronos.ai.get_endpoint_stats(),
+        "admission": chronos.ai.get_admission_stats(),
+        "suggestion_table": chronos.ai.get_suggestion_table_stats(),
+        "latency": chronos.ai.get_latency_stats(),
+        "generated_at": datetime.now().isoformat()
+    }
+
+@app.get("/health/backends")
+async def get_backends_health():
+    """Estado dos circuit breakers do LocalAI e do Notion"""
+    from integrations.circuit_breaker import breaker_states
+
+    breakers = breaker_states()
+    return {
+        "success": True,
+        "breakers": breakers,
+        "degraded": any(b['state'] != 'closed' for b in breakers.values()),
+        "generated_at": datetime.now().isoformat()
+    }
+
+@app.on_event("shutdown")
+async def shutdown_chronos():
+    """Envia escritas pendentes ao Notion antes de encerrar"""
+    if chronos:
+        chronos.shutdown()
+
 async def process_feedback_async(feedback_data: Dict):
     """Processa feedback de forma assíncrona"""
     try:
-        chronos.feedback.process_feedback(feedback_data)
+        result = chronos.feedback.process_feedback(feedback_data)
+        chronos.invalidate_context()
+        if result.get('pattern_updates'):
+            chronos.ai.invalidate_suggestions()
+        chronos.refresh_patterns()
+        chronos.record_task_update(feedback_data['task_id'], {'feedback_rating': feedback_data['rating']})
         print(f"✅ Feedback processado: {feedback_data.get('task_id')}")
     except Exception as e:
         print(f"❌ Erro no processamento do feedback: {e}")
@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+class ContextSnapshotCache:
+    """Snapshot do contexto de agendamento com TTL curto e invalidação por versão.
+
+    Requisições seguidas reaproveitam o mesmo snapshot; criar tarefa ou receber feedback
+    incrementa a versão e força a próxima leitura a remontá-lo. Só um thread monta por vez,
+    os demais esperam e usam o resultado.
+    """
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: Optional[Dict] = None
+        self._built_at = 0.0
+        self._built_version = -1
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def get(self, build: Callable[[], Dict]) -> Dict:
+        """Snapshot válido ou um novo montado por build()"""
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot
+
+        with self._build_lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot
+
+            with self._lock:
+                version = self.version
+            snapshot = build()
+            with self._lock:
+                # Invalidado durante a montagem: entrega, mas não guarda
+                if self.version == version and self.ttl > 0:
+                    self._snapshot = snapshot
+                    self._built_at = time.monotonic()
+                    self._built_version = version
+            return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+
+    def _fresh(self) -> Optional[Dict]:
+        with self._lock:
+            if (self._snapshot is not None and self._built_version == self.version
+                    and time.monotonic() - self._built_at < self.ttl):
+                return self._snapshot
+            return None
@@ -1,5 +1,12 @@
-from datetime import datetime
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta, timezone
+import os
+import uuid
+from typing import Dict, List, Optional
+from core.context_cache import ContextSnapshotCache
+from core.slot_engine import SlotEngine, parse_local_datetime
+
+PRIORITY_ORDER = {'Urgente': 0, 'Alta': 1, 'Média': 2, 'Baixa': 3}
 
 class ChronosCore:
     """Motor principal do CHRONOS AI - Orquestra todo o sistema"""
@@ -12,6 +19,8 @@ class ChronosCore:
         # Inicializa componentes
         from integrations.notion_client import NotionClient
         from integrations.ai_client import AIClient
+        from integrations.notion_mirror import NotionMirror
+        from integrations.notion_outbox import NotionOutbox
         from learning.pattern_analyzer import PatternAnalyzer
         from learning.feedback_processor import FeedbackProcessor
         
@@ -20,10 +29,26 @@ class ChronosCore:
         database_id = config.get('database_id') or ''
         
         self.notion = NotionClient(notion_token, database_id)
+        self.mirror = NotionMirror(self.notion)
+        self.outbox = NotionOutbox(self.notion, on_created=self._on_notion_task_created)
+        # PATCHes que esgotam as tentativas do coalescer seguem pelo outbox durável
+        self.notion.updates.on_failed = self.outbox.enqueue_update
         self.ai = AIClient()  # IA local - não precisa de token
-        self.analyzer = PatternAnalyzer()
+        self.analyzer = PatternAnalyzer(history_source=self.mirror.get_task_history)
         self.feedback = FeedbackProcessor()
         
+        # Expediente (horas) e horizonte em dias para resolver conflitos de horário
+        self.workday = (int(os.getenv('WORKDAY_START', '8')), int(os.getenv('WORKDAY_END', '19')))
+        self.horizon_days = int(os.getenv('SCHEDULE_HORIZON_DAYS', '7'))
+        # Onde colocar tarefas em conflito: 'scored' (grade pontuada) ou 'earliest' (primeiro livre)
+        self.placement = os.getenv('SCHEDULE_PLACEMENT', 'scored').lower()
+        
+        # Snapshot de contexto (tarefas de hoje, performance, padrões) com TTL curto
+        self.context_cache = ContextSnapshotCache(ttl=float(os.getenv('CONTEXT_TTL', '5')))
+        self._stage_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('ORCHESTRATE_WORKERS', '8')), thread_name_prefix="chronos-stage"
+        )
+        
         # Verificar configuração
         missing_configs = []
         if not notion_token:
@@ -37,50 +62,40 @@ class ChronosCore:
             print(f"💡 Para integração completa, configure: {', '.join(missing_configs)}")
         else:
             print(f"✅ Configuração: Todas as integrações configuradas (IA Local + Notion)")
+            sync_interval = float(config.get('notion_sync_interval') or os.getenv('NOTION_SYNC_INTERVAL', '60'))
+            self.mirror.start_background_sync(sync_interval)
+            self.outbox.start()
         
         print(f"🤖 CHRONOS AI v{self.version} initialized - Session: {self.session_id}")
     
     def orchestrate_schedule(self, task_data: Dict) -> Dict:
         """Método principal que orquestra todo o processo de agendamento"""
         
-        # 1. Coleta contexto atual
-        context = self._gather_context()
+        # 1-2. Estágios independentes em paralelo: o contexto (tarefas do dia, performance, padrões)
+        # é coletado no pool enquanto a IA gera a sugestão - o prompt depende só da tarefa
+        context_future = self._stage_pool.submit(self._context_snapshot)
+        suggestion = self._generate_suggestion(task_data)
         
-        # 2. Analisa padrões do usuário
-        user_patterns = self.analyzer.get_current_patterns()
+        # 3. Junção: a colocação precisa das tarefas existentes e dos padrões
+        context, user_patterns = context_future.result()
         
-        # 3. Gera sugestão inteligente com IA local
-        try:
-            print(f"🤖 IA Local: Gerando sugestão para '{task_data.get('title', 'Tarefa')}'")
-            suggestion = self.ai.generate_schedule_suggestion(
-                task_data, user_patterns, context
-            )
-            if suggestion and isinstance(suggestion, dict) and suggestion.get('scheduled_datetime'):
-                print(f"🤖 IA Local: ✅ Sugestão gerada com sucesso")
-            else:
-                print(f"🤖 IA Local: ❌ Falha na geração - usando fallback")
-                suggestion = self._generate_fallback_suggestion(task_data)
-        except Exception as e:
-            error_type = type(e).__name__
-            print(f"🤖 IA Local: ❌ Erro [{error_type}] - fallback ativado")
-            suggestion = self._generate_fallback_suggestion(task_data)
+        # 4. Valida e otimiza (desloca para o primeiro horário livre se o sugerido estiver ocupado)
+        optimized_suggestion = self._optimize_suggestion(suggestion, context, task_data, user_patterns)
         
-        # 4. Valida e otimiza
-        optimized_suggestion = self._optimize_suggestion(suggestion, context)
+        # 5. Enfileira criação da tarefa no Notion (se configurado) - enviada em background
+        if not optimized_suggestion.get('task_id'):
+            optimized_suggestion['task_id'] = f"task_{uuid.uuid4().hex[:8]}"
         
-        # 5. Cria tarefa no Notion (se configurado)
-        notion_task_id = None
+        notion_status = 'disabled'
         if self.config.get('notion_token') and self.config.get('database_id'):
             try:
-                print(f"📝 Criando tarefa no Notion...")
-                notion_task_id = self.notion.create_task(task_data, optimized_suggestion)
-                if notion_task_id:
-                    print(f"✅ Tarefa criada no Notion: {notion_task_id[:8]}...")
-                    optimized_suggestion['notion_task_id'] = notion_task_id
-                else:
-                    print(f"⚠️ Falha ao criar tarefa no Notion")
+                self.outbox.enqueue_create(optimized_suggestion['task_id'], task_data, optimized_suggestion)
+                self.context_cache.invalidate()
+                notion_status = 'queued'
+                print(f"📮 Tarefa enfileirada para o Notion: {optimized_suggestion['task_id']}")
             except Exception as e:
-                print(f"❌ Erro ao criar tarefa no Notion: {e}")
+                print(f"❌ Erro ao enfileirar tarefa para o Notion: {e}")
+                notion_status = 'error'
         else:
             print(f"⚠️ Notion não configurado - tarefa não será salva")
         
@@ -93,15 +108,161 @@ class ChronosCore:
             'confidence': optimized_suggestion.get('confidence', 0.5),
             'reasoning': optimized_suggestion.get('reasoning', ''),
             'alternatives': optimized_suggestion.get('alternatives', []),
-            'notion_task_id': notion_task_id
+            'notion_task_id': None,
+            'notion_status': notion_status
         }
     
-    def _gather_context(self) -> Dict:
+    def orchestrate_batch(self, tasks: List[Dict]) -> Dict:
+        """Agenda várias tarefas de uma vez: um contexto, colocação conjunta e uma escrita em lote.
+
+        Como em orchestrate_schedule, o contexto é coletado em paralelo com as sugestões da IA.
+
+        As tarefas são colocadas por prioridade e due date; cada uma ocupa seu horário antes da
+        próxima ser posicionada, então o lote não conflita consigo nem com a agenda existente.
+        """
+        context_future = self._stage_pool.submit(self._context_snapshot)
+        
+        print(f"🤖 IA Local: Gerando {len(tasks)} sugestão(ões) em lote")
+        try:
+            suggestions = self.ai.generate_hedged_suggestions(tasks, {}, {})
+        except Exception as e:
+            print(f"🤖 IA Local: ❌ Erro [{type(e).__name__}] - fallback ativado para o lote")
+            suggestions = [None] * len(tasks)
+        
+        suggestions = [
+            suggestion if suggestion and isinstance(suggestion, dict) and suggestion.get('scheduled_datetime')
+            else self._generate_fallback_suggestion(task_data)
+            for task_data, suggestion in zip(tasks, suggestions)
+        ]
+        
+        context, user_patterns = context_future.result()
+        
+        # Agenda ocupada cobrindo a janela de busca de todas as sugestões do lote
+        windows = [self._search_days(start) for start in
+                   (parse_local_datetime(s.get('scheduled_datetime')) for s in suggestions) if start is not None]
+        windows = windows or [self._search_days(datetime.now())]
+        engine = self._schedule_engine(min(first for first, _ in windows), max(last for _, last in windows))
+        
+        placed: List[Optional[Dict]] = [None] * len(tasks)
+        for index in sorted(range(len(tasks)), key=lambda i: self._batch_order(tasks[i], i)):
+            task_data, suggestion = tasks[index], suggestions[index]
+            suggestion = self._place_suggestion(suggestion, engine, task_data, user_patterns)
+            start = parse_local_datetime(suggestion.get('scheduled_datetime'))
+            if start is not None:
+                engine.book(start, start + timedelta(minutes=self._suggestion_minutes(suggestion, task_data)))
+            if not suggestion.get('task_id'):
+                suggestion['task_id'] = f"task_{uuid.uuid4().hex[:8]}"
+            placed[index] = suggestion
+        
+        notion_status = 'disabled'
+        if self.config.get('notion_token') and self.config.get('database_id'):
+            try:
+                self.outbox.enqueue_creates([
+                    (suggestion['task_id'], task_data, suggestion) for task_data, suggestion in zip(tasks, placed)
+                ])
+                self.context_cache.invalidate()
+                notion_status = 'queued'
+                print(f"📮 {len(tasks)} tarefa(s) enfileirada(s) para o Notion em lote")
+            except Exception as e:
+                print(f"❌ Erro ao enfileirar lote para o Notion: {e}")
+                notion_status = 'error'
+        else:
+            print(f"⚠️ Notion não configurado - tarefas não serão salvas")
+        
+        return {
+            'session_id': self.session_id,
+            'results': [
+                {'task': task_data, 'suggestion': suggestion} for task_data, suggestion in zip(tasks, placed)
+            ],
+            'context': context,
+            'notion_status': notion_status
+        }
+    
+    def _generate_suggestion(self, task_data: Dict) -> Dict:
+        """Sugestão da IA local (com hedge), ou o fallback local se ela falhar"""
+        try:
+            print(f"🤖 IA Local: Gerando sugestão para '{task_data.get('title', 'Tarefa')}'")
+            suggestion = self.ai.generate_hedged_suggestion(task_data, {}, {})
+            if suggestion and isinstance(suggestion, dict) and suggestion.get('scheduled_datetime'):
+                print(f"🤖 IA Local: ✅ Sugestão gerada com sucesso")
+                return suggestion
+            print(f"🤖 IA Local: ❌ Falha na geração - usando fallback")
+        except Exception as e:
+            error_type = type(e).__name__
+            print(f"🤖 IA Local: ❌ Erro [{error_type}] - fallback ativado")
+        return self._generate_fallback_suggestion(task_data)
+    
+    @staticmethod
+    def _batch_order(task_data: Dict, index: int) -> tuple:
+        """Chave de colocação: prioridade, due date (sem data por último) e ordem de chegada"""
+        due = task_data.get('due_date') or ''
+        return (PRIORITY_ORDER.get(task_data.get('priority'), len(PRIORITY_ORDER)), due == '', due, index)
+    
+    def get_tasks_for_date(self, day: date) -> List[Dict]:
+        """Tarefas agendadas para um dia (filtradas no servidor, com cache por dia)"""
+        if not (self.config.get('notion_token') and self.config.get('database_id')):
+            return []
+        return self.notion.get_tasks_for_day(day)
+    
+    def get_notion_status(self, task_id: str) -> Optional[Dict]:
+        """Status da escrita no Notion de uma tarefa agendada (page id quando concluída)"""
+        return self.outbox.get_status(task_id)
+    
+    def record_task_update(self, task_id: str, updates: Dict):
+        """Envia atualizações de uma tarefa ao Notion (PATCHes da mesma página são coalescidos)"""
+        if not (self.config.get('notion_token') and self.config.get('database_id')):
+            return
+        
+        status = self.outbox.get_status(task_id)
+        if status is None:
+            # Não passou pelo outbox: task_id já é o page id do Notion. Se há atualizações
+            # repassadas pelo coalescer ainda na fila, esta vai atrás delas
+            if self.outbox.has_pending_updates(task_id):
+                self.outbox.enqueue_update(task_id, updates)
+            else:
+                self.notion.queue_update(task_id, updates)
+        elif status['status'] == 'done' and not status['pending_updates']:
+            self.notion.queue_update(status['notion_page_id'], updates)
+        elif status['status'] == 'failed':
+            print(f"⚠️ Tarefa {task_id} não foi criada no Notion - atualização ignorada")
+        else:
+            # Criação ou atualizações anteriores ainda na fila: mantém a ordem pelo outbox
+            self.outbox.enqueue_update(task_id, updates)
+    
+    def shutdown(self):
+        """Encerra workers de background, enviando escritas pendentes"""
+        self.mirror.stop_background_sync()
+        self.outbox.stop()
+        self.notion.close()
+        self._stage_pool.shutdown(wait=False)
+    
+    def refresh_patterns(self) -> Dict:
+        """Reanalisa os padrões a partir do histórico do espelho e descarta o que dependia deles"""
+        patterns = self.analyzer.refresh_patterns()
+        if patterns:
+            self.context_cache.invalidate()
+            self.ai.invalidate_suggestions()
+        return patterns
+    
+    def invalidate_context(self):
+        """Descarta o snapshot de contexto (ex.: feedback recebido)"""
+        self.context_cache.invalidate()
+    
+    def _context_snapshot(self) -> tuple:
+        """Contexto e padrões do usuário; current_time é sempre o do momento da chamada"""
+        snapshot = self.context_cache.get(self._build_context_snapshot)
+        return dict(snapshot['context'], current_time=datetime.now().isoformat()), snapshot['user_patterns']
+    
+    def _build_context_snapshot(self) -> Dict:
+        user_patterns = self.analyzer.get_current_patterns()
+        return {'context': self._gather_context(user_patterns), 'user_patterns': user_patterns}
+    
+    def _gather_context(self, user_patterns: Optional[Dict] = None) -> Dict:
         """Coleta contexto atual do usuário"""
         try:
             if self.config.get('notion_token'):
-                existing_tasks = self.notion.get_today_tasks()
-                print(f"📋 Notion: {len(existing_tasks)} tarefa(s) encontrada(s) para hoje")
+                existing_tasks = self.mirror.get_today_tasks()
+                print(f"📋 Mirror: {len(existing_tasks)} tarefa(s) encontrada(s) para hoje")
             else:
                 existing_tasks = []
                 print(f"📋 Notion: Pulando busca (token não configurado)")
@@ -113,14 +274,138 @@ class ChronosCore:
             'current_time': datetime.now().isoformat(),
             'existing_tasks': existing_tasks,
             'recent_performance': self.analyzer.get_recent_performance(),
-            'energy_patterns': self.analyzer.get_energy_patterns(),
+            'energy_patterns': user_patterns.get('energy_cycles', {}) if user_patterns is not None
+                               else self.analyzer.get_energy_patterns(),
             'workload_status': self._calculate_workload_status()
         }
     
-    def _optimize_suggestion(self, suggestion: Dict, context: Dict) -> Dict:
-        """Otimiza sugestão baseada no contexto"""
-        # Implementa lógica de otimização
-        return suggestion
+    def _on_notion_task_created(self, task_ref: str, notion_task_id: str, task_data: Dict, suggestion: Dict):
+        """Callback do outbox quando a página é criada no Notion"""
+        print(f"✅ Tarefa {task_ref} criada no Notion: {notion_task_id[:8]}...")
+        self._mirror_created_task(notion_task_id, task_data, suggestion)
+        self.context_cache.invalidate()
+    
+    def _mirror_created_task(self, notion_task_id: str, task_data: Dict, suggestion: Dict):
+        """Registra a tarefa recém-criada no espelho sem esperar o próximo sync"""
+        try:
+            self.mirror.upsert_tasks([{
+                'id': notion_task_id,
+                'title': task_data.get('title'),
+                'category': task_data.get('category'),
+                'priority': task_data.get('priority'),
+                'status': 'Pendente',
+                'estimated_time': task_data.get('estimated_time'),
+                'created_date': datetime.now(timezone.utc).isoformat(),
+                'due_date': task_data.get('due_date'),
+                'scheduled_time': suggestion.get('scheduled_datetime'),
+                'description': task_data.get('description'),
+                'tags': task_data.get('tags')
+            }])
+        except Exception as e:
+            print(f"⚠️ Mirror: falha ao registrar tarefa criada: {e}")
+    
+    def _optimize_suggestion(self, suggestion: Dict, context: Dict, task_data: Optional[Dict] = None,
+                             user_patterns: Optional[Dict] = None) -> Dict:
+        """Otimiza sugestão baseada no contexto: resolve conflitos com as tarefas já agendadas.
+
+        O contexto só traz as tarefas de hoje; os conflitos são checados na agenda do horizonte
+        inteiro a partir do horário sugerido.
+        """
+        proposed = parse_local_datetime(suggestion.get('scheduled_datetime'))
+        if proposed is None:
+            return suggestion
+        engine = self._schedule_engine(*self._search_days(proposed))
+        return self._place_suggestion(suggestion, engine, task_data, user_patterns)
+    
+    def _search_days(self, proposed: datetime) -> tuple:
+        """Primeiro e último dia em que um horário sugerido pode ser colocado.
+
+        A agenda ocupada, a grade pontuada e a busca do primeiro livre usam esta mesma janela,
+        então nenhum dia pesquisado fica sem as suas tarefas.
+        """
+        return proposed.date(), proposed.date() + timedelta(days=self.horizon_days)
+    
+    def _schedule_engine(self, first_day: date, last_day: date) -> SlotEngine:
+        """Agenda ocupada de first_day a last_day: tarefas do espelho e criações ainda no outbox"""
+        if not self.config.get('notion_token'):
+            return SlotEngine()
+        
+        # Um dia antes: tarefas longas da véspera podem invadir o primeiro dia
+        start = datetime.combine(first_day - timedelta(days=1), time())
+        end = datetime.combine(last_day + timedelta(days=1), time())
+        try:
+            # Outbox antes do espelho: uma criação concluída no meio aparece em pelo menos um dos dois
+            tasks = self.outbox.pending_creates() + self.mirror.get_tasks_between(start, end)
+        except Exception as e:
+            print(f"🗓️ Slots: falha ao ler a agenda ({type(e).__name__}) - sem checagem de conflitos")
+            tasks = []
+        return SlotEngine.from_tasks(tasks)
+    
+    def _place_suggestion(self, suggestion: Dict, engine: SlotEngine, task_data: Optional[Dict] = None,
+                          user_patterns: Optional[Dict] = None) -> Dict:
+        """Mantém o horário sugerido se estiver livre no engine; senão move para o melhor horário livre"""
+        proposed = parse_local_datetime(suggestion.get('scheduled_datetime'))
+        if proposed is None:
+            return suggestion
+        
+        minutes = self._suggestion_minutes(suggestion, task_data)
+        duration = timedelta(minutes=minutes)
+        if engine.is_free(proposed, proposed + duration):
+            return suggestion
+        
+        slots = []
+        if self.placement == 'scored':
+            slots = self._score_free_slots(engine, dict(task_data or {}, estimated_time=float(minutes)),
+                                           proposed, user_patterns or {})
+        slots = slots or self._find_free_slots(engine, duration, proposed)
+        if not slots:
+            print(f"🗓️ Slots: nenhum horário livre em {self.horizon_days} dia(s) - mantendo sugestão")
+            return suggestion
+        
+        start = slots[0]
+        print(f"🗓️ Slots: {proposed.strftime('%H:%M')} ocupado - movido para {start.strftime('%d/%m %H:%M')}")
+        return dict(
+            suggestion,
+            scheduled_datetime=start.isoformat(),
+            reasoning=f"{suggestion.get('reasoning', '')} (ajustado para {start.strftime('%H:%M')}: "
+                      f"{proposed.strftime('%H:%M')} já ocupado)".strip(),
+            alternatives=[
+                f"Alternativa {i}: {slot.strftime('%H:%M' if slot.date() == start.date() else '%d/%m %H:%M')}"
+                for i, slot in enumerate(slots[1:], 1)
+            ],
+            rescheduled_from=proposed.isoformat()
+        )
+    
+    @staticmethod
+    def _suggestion_minutes(suggestion: Dict, task_data: Optional[Dict]) -> float:
+        return float(suggestion.get('duration_minutes') or (task_data or {}).get('estimated_time') or 60)
+    
+    def _score_free_slots(self, engine: SlotEngine, task_data: Dict, proposed: datetime, user_patterns: Dict,
+                          limit: int = 3) -> List[datetime]:
+        """Melhores horários livres no horizonte segundo padrões, janela da categoria e due date"""
+        from core.slot_scoring import SlotScorer
+        
+        first_day, last_day = self._search_days(proposed)
+        scorer = SlotScorer(user_patterns, self.workday)
+        result = scorer.score(task_data, engine.intervals(), proposed, (last_day - first_day).days + 1, top_k=limit)
+        return [slot['start'] for slot in result['top']]
+    
+    def _find_free_slots(self, engine: SlotEngine, duration: timedelta, proposed: datetime, limit: int = 3) -> List[datetime]:
+        """Horários livres a partir do sugerido: resto do dia, depois o expediente dos dias seguintes"""
+        day_start, day_end = self.workday
+        first_day, last_day = self._search_days(proposed)
+        for offset in range((last_day - first_day).days + 1):
+            day = first_day + timedelta(days=offset)
+            if offset == 0:
+                window_start = proposed
+                window_end = max(datetime.combine(day, time(day_end)), proposed + duration)
+            else:
+                window_start = datetime.combine(day, time(day_start))
+                window_end = datetime.combine(day, time(day_end))
+            slots = engine.free_slots(duration, window_start, window_end, limit)
+            if slots:
+                return slots
+        return []
     
     def _calculate_workload_status(self) -> Dict:
         """Calcula status atual da carga de trabalho"""
@@ -134,23 +419,13 @@ class ChronosCore:
     def _generate_fallback_suggestion(self, task_data: Dict) -> Dict:
         """Gera sugestão básica quando Claude não está disponível"""
         from datetime import timedelta
+        from integrations.suggestion_table import fallback_rule
         import uuid
         
         print(f"⚙️ Fallback: Gerando sugestão local para '{task_data.get('title', 'Tarefa')}'")
         
-        # Lógica simples baseada na categoria
-        hour_offset = 1  # Default
-        reasoning_detail = "baseado em horário padrão"
-        
-        if task_data.get('category') == 'Development':
-            hour_offset = 1  # Manhã
-            reasoning_detail = "Development funciona melhor pela manhã"
-        elif task_data.get('category') == 'Meetings':
-            hour_offset = 3  # Meio do dia
-            reasoning_detail = "Meetings são ideais no meio do dia"
-        elif task_data.get('priority') == 'Urgente':
-            hour_offset = 0.5  # Muito em breve
-            reasoning_detail = "prioridade urgente requer ação imediata"
+        # Regra simples por categoria/prioridade (tabela pré-calculada)
+        hour_offset, reasoning_detail = fallback_rule(task_data.get('category'), task_data.get('priority'))
         
         scheduled_time = datetime.now() + timedelta(hours=hour_offset)
         
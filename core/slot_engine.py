@@ -0,0 +1,142 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def parse_local_datetime(value) -> Optional[datetime]:
+    """ISO 8601 (com ou sem fuso) -> datetime local sem fuso; None para datas sem horário"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and len(value) > 10:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+class SlotEngine:
+    """Intervalos ocupados da agenda e busca do primeiro horário livre.
+
+    Os intervalos ficam ordenados e mesclados; entre eles há n + 1 lacunas (a primeira e a
+    última sem limite). Uma árvore de segmentos guarda o maior tamanho de lacuna por faixa,
+    então "primeiro horário livre de duração d dentro da janela W" é resolvido em O(log n).
+    """
+
+    def __init__(self, busy: Iterable[Tuple[datetime, datetime]] = ()):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        merged = []
+        for start, end in sorted((s, e) for s, e in busy if e > s):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        for start, end in merged:
+            self._starts.append(start)
+            self._ends.append(end)
+        self._build_tree()
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Dict], default_minutes: float = 60) -> 'SlotEngine':
+        """Intervalos a partir das tarefas do Notion (scheduled_time + estimated_time em minutos)"""
+        busy = []
+        for task in tasks:
+            start = parse_local_datetime(task.get('scheduled_time'))
+            if start is None:
+                continue
+            try:
+                minutes = float(task.get('estimated_time') or default_minutes)
+            except (TypeError, ValueError):
+                minutes = default_minutes
+            busy.append((start, start + timedelta(minutes=minutes)))
+        return cls(busy)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def intervals(self) -> List[Tuple[datetime, datetime]]:
+        return list(zip(self._starts, self._ends))
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """True se [start, end) não cruza nenhum intervalo ocupado"""
+        i = bisect_right(self._ends, start)
+        return i == len(self._starts) or self._starts[i] >= end
+
+    def earliest_free(self, duration: timedelta, window_start: datetime, window_end: datetime) -> Optional[datetime]:
+        """Início do primeiro horário livre de tamanho duration dentro de [window_start, window_end]"""
+        if window_end - window_start < duration:
+            return None
+
+        # Lacuna i vai de ends[i-1] a starts[i]; first/last são as que cruzam as bordas da janela
+        first = bisect_right(self._ends, window_start)
+        last = bisect_left(self._starts, window_end)
+
+        start = self._fit(first, duration, window_start, window_end)
+        if start is not None or first == last:
+            return start
+
+        # Lacunas do meio estão inteiras dentro da janela: basta o tamanho
+        middle = self._find_first(1, 0, self._size - 1, first + 1, last - 1, duration.total_seconds())
+        if middle is not None:
+            return self._ends[middle - 1]
+        return self._fit(last, duration, window_start, window_end)
+
+    def free_slots(self, duration: timedelta, window_start: datetime, window_end: datetime,
+                   limit: int = 3) -> List[datetime]:
+        """Até limit inícios livres sem sobreposição entre si, em ordem"""
+        slots = []
+        cursor = window_start
+        while len(slots) < limit:
+            start = self.earliest_free(duration, cursor, window_end)
+            if start is None:
+                break
+            slots.append(start)
+            cursor = start + duration
+        return slots
+
+    def book(self, start: datetime, end: datetime):
+        """Marca [start, end) como ocupado, mesclando com intervalos vizinhos"""
+        if end <= start:
+            return
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+        self._build_tree()
+
+    def _fit(self, gap: int, duration: timedelta, window_start: datetime, window_end: datetime) -> Optional[datetime]:
+        """Início da lacuna recortada pela janela, se couber duration"""
+        start = window_start if gap == 0 else max(window_start, self._ends[gap - 1])
+        end = window_end if gap == len(self._starts) else min(window_end, self._starts[gap])
+        return start if end - start >= duration else None
+
+    def _build_tree(self):
+        count = len(self._starts)
+        gaps = [float('inf')]
+        gaps.extend((self._starts[i] - self._ends[i - 1]).total_seconds() for i in range(1, count))
+        if count:
+            gaps.append(float('inf'))
+
+        self._size = 1
+        while self._size < len(gaps):
+            self._size *= 2
+        self._tree = [0.0] * (2 * self._size)
+        self._tree[self._size:self._size + len(gaps)] = gaps
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def _find_first(self, node: int, node_lo: int, node_hi: int, lo: int, hi: int, need: float) -> Optional[int]:
+        """Menor índice de lacuna em [lo, hi] com tamanho >= need"""
+        if lo > hi or node_hi < lo or node_lo > hi or self._tree[node] < need:
+            return None
+        if node_lo == node_hi:
+            return node_lo
+        mid = (node_lo + node_hi) // 2
+        found = self._find_first(2 * node, node_lo, mid, lo, hi, need)
+        if found is None:
+            found = self._find_first(2 * node + 1, mid + 1, node_hi, lo, hi, need)
+        return found
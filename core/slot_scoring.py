@@ -0,0 +1,160 @@
+import math
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from core.slot_engine import parse_local_datetime
+from integrations.suggestion_table import preferred_window
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Peso da preferência por começar cedo, por prioridade
+PRIORITY_URGENCY = {'Urgente': 1.0, 'Alta': 0.4, 'Média': 0.1, 'Baixa': 0.0}
+
+DEFAULT_WEIGHTS = {
+    'productivity': 1.0,   # hourly_productivity
+    'energy': 0.5,         # energy_cycles
+    'category': 0.3,       # começa dentro da janela da categoria
+    'late': 1.0            # penalidade por terminar depois do due_date
+}
+
+def hourly_profile(hourly: Optional[Dict], key: str) -> np.ndarray:
+    """Perfil de 24 horas normalizado em [0, 1] a partir de um padrão {hora: {key, confidence}}.
+
+    Horas sem dado ficam na média; valores com pouca confiança são puxados para a média.
+    """
+    values = np.full(24, np.nan)
+    confidence = np.ones(24)
+    for hour, data in (hourly or {}).items():
+        try:
+            h = int(hour)
+            values[h] = float(data[key])
+            confidence[h] = min(max(float(data.get('confidence', 1.0)), 0.0), 1.0)
+        except (KeyError, TypeError, ValueError, IndexError):
+            continue
+
+    known = ~np.isnan(values)
+    if not known.any():
+        return np.full(24, 0.5)
+    mean = values[known].mean()
+    profile = np.where(known, confidence * np.nan_to_num(values) + (1 - confidence) * mean, mean)
+    top = profile.max()
+    return profile / top if top > 0 else np.full(24, 0.5)
+
+def weekday_profile(daily: Optional[Dict]) -> np.ndarray:
+    """Fator por dia da semana (1.0 no melhor dia; dias sem dado ficam em 1.0)"""
+    values = np.array([
+        float((daily or {}).get(name, {}).get('efficiency', np.nan)) for name in DAY_NAMES
+    ])
+    known = ~np.isnan(values)
+    if not known.any() or values[known].max() <= 0:
+        return np.ones(7)
+    return np.where(known, values / values[known].max(), 1.0)
+
+class SlotScorer:
+    """Pontua de uma vez todos os inícios possíveis de uma tarefa num horizonte de dias.
+
+    Cada dia vira um vetor de bins de bin_minutes. A qualidade de cada bin combina
+    produtividade e energia por hora e o fator do dia da semana. A pontuação de um início é
+    a média da qualidade sobre a duração, mais o bônus da janela da categoria e a preferência
+    por cedo (prioridade). Inícios que cruzam bins ocupados ou fora do expediente são descartados;
+    só contam inícios em múltiplos de start_step_minutes.
+    """
+
+    def __init__(self, patterns: Dict, workday: Tuple[int, int] = (8, 19), bin_minutes: int = 5,
+                 start_step_minutes: int = 15, weights: Optional[Dict] = None):
+        self.workday = workday
+        self.bin_minutes = bin_minutes
+        self.start_step = max(1, start_step_minutes // bin_minutes)
+        self.bins_per_day = 24 * 60 // bin_minutes
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+
+        productivity = hourly_profile(patterns.get('hourly_productivity'), 'efficiency')
+        energy = hourly_profile((patterns.get('energy_cycles') or {}).get('hourly_energy'), 'energy_level')
+        self._weekday = weekday_profile(patterns.get('daily_productivity'))
+
+        self._bin_hour = np.arange(self.bins_per_day) * bin_minutes // 60
+        self._quality = (self.weights['productivity'] * productivity[self._bin_hour]
+                         + self.weights['energy'] * energy[self._bin_hour])
+        self._workday_bins = (self._bin_hour >= workday[0]) & (self._bin_hour < workday[1])
+
+    def score(self, task_data: Dict, busy: List[Tuple[datetime, datetime]], not_before: datetime,
+              days: int, top_k: int = 3) -> Dict:
+        """Melhor início (argmax) e os top_k inícios sem sobreposição entre si"""
+        origin = datetime.combine(not_before.date(), time())
+        horizon = days * self.bins_per_day
+        span = max(1, math.ceil(float(task_data.get('estimated_time') or 60) / self.bin_minutes))
+        starts = horizon - span + 1
+        if starts <= 0:
+            return {'best': None, 'score': None, 'top': []}
+
+        weekday = (origin.weekday() + np.arange(days)) % 7
+        quality = (self._weekday[weekday][:, None] * self._quality[None, :]).ravel()
+
+        blocked = ~np.tile(self._workday_bins, days)
+        first = self._bin_index(origin, not_before, math.ceil)
+        blocked[:first] = True
+        blocked |= self._busy_mask(busy, origin, horizon)
+
+        # Somas acumuladas: bins bloqueados e qualidade média sobre [i, i + span) para todo i
+        blocked_sum = np.concatenate(([0], np.cumsum(blocked)))
+        quality_sum = np.concatenate(([0.0], np.cumsum(quality)))
+        feasible = ((blocked_sum[span:] - blocked_sum[:-span]) == 0) & (np.arange(starts) % self.start_step == 0)
+        scores = (quality_sum[span:] - quality_sum[:-span]) / span
+
+        start_hour, end_hour = preferred_window(task_data.get('category', 'Development'),
+                                                task_data.get('priority', 'Média'))
+        in_window = np.tile((self._bin_hour >= start_hour) & (self._bin_hour < end_hour), days)[:starts]
+        scores += self.weights['category'] * in_window
+        # Preferência por cedo cai pela metade a cada dia depois de not_before
+        delay_days = np.maximum(np.arange(starts) - first, 0) / self.bins_per_day
+        scores += PRIORITY_URGENCY.get(task_data.get('priority'), 0.1) * 0.5 ** delay_days
+
+        due = self._due_datetime(task_data.get('due_date'))
+        if due is not None:
+            late = np.arange(starts) + span > self._bin_index(origin, due, math.floor)
+            if (feasible & ~late).any():
+                feasible &= ~late
+            else:
+                scores -= self.weights['late'] * late
+
+        scores = np.where(feasible, scores, -np.inf)
+        if not np.isfinite(scores).any():
+            return {'best': None, 'score': None, 'top': []}
+
+        top = []
+        # Ordenação estável: em empate vence o início mais cedo
+        for index in np.argsort(-scores, kind='stable'):
+            if not np.isfinite(scores[index]) or len(top) >= top_k:
+                break
+            if all(abs(int(index) - chosen) >= span for chosen, _ in top):
+                top.append((int(index), float(scores[index])))
+
+        slots = [{'start': origin + timedelta(minutes=index * self.bin_minutes), 'score': round(score, 4)}
+                 for index, score in top]
+        return {'best': slots[0]['start'], 'score': slots[0]['score'], 'top': slots}
+
+    def _bin_index(self, origin: datetime, moment: datetime, rounding) -> int:
+        return int(rounding((moment - origin).total_seconds() / 60 / self.bin_minutes))
+
+    def _busy_mask(self, busy: List[Tuple[datetime, datetime]], origin: datetime, horizon: int) -> np.ndarray:
+        """Máscara de bins ocupados (diferenças +1/-1 e soma acumulada)"""
+        if not busy:
+            return np.zeros(horizon, dtype=bool)
+        offsets = np.array([((start - origin).total_seconds(), (end - origin).total_seconds())
+                            for start, end in busy]) / 60 / self.bin_minutes
+        lo = np.clip(np.floor(offsets[:, 0]).astype(int), 0, horizon)
+        hi = np.clip(np.ceil(offsets[:, 1]).astype(int), 0, horizon)
+        diff = np.zeros(horizon + 1, dtype=int)
+        np.add.at(diff, lo, 1)
+        np.add.at(diff, hi, -1)
+        return np.cumsum(diff)[:horizon] > 0
+
+    def _due_datetime(self, value) -> Optional[datetime]:
+        """due_date com horário, ou fim do expediente quando vem só a data"""
+        due = parse_local_datetime(value)
+        if due is None and isinstance(value, str) and len(value) == 10:
+            try:
+                due = datetime.combine(datetime.fromisoformat(value).date(), time(self.workday[1]))
+            except ValueError:
+                return None
+        return due
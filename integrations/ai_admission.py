@@ -0,0 +1,59 @@
+import math
+import threading
+from typing import Callable, Dict, Optional
+
+class AdmissionController:
+    """Controle de admissão por SLO de latência para chamadas ao LocalAI.
+
+    Estima a espera de uma nova requisição pela fila atual (requisições em andamento),
+    a capacidade (instâncias saudáveis x concorrência por instância) e o tempo de serviço
+    recente (EWMA). Se a previsão passa do SLO, a requisição é recusada e vai para a heurística.
+    """
+
+    def __init__(self, slo_ms: float, capacity: Callable[[], int], alpha: float = 0.2):
+        self.slo_ms = slo_ms
+        self.capacity = capacity
+        self.alpha = alpha
+        self.in_flight = 0
+        self.service_ms: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {'admitted': 0, 'shed': 0}
+
+    def try_admit(self) -> bool:
+        """Admite a requisição (e a conta como em andamento) se a espera prevista cabe no SLO"""
+        with self._lock:
+            predicted = self._predict_ms()
+            if self.slo_ms > 0 and predicted is not None and predicted > self.slo_ms:
+                self.stats['shed'] += 1
+                return False
+            self.in_flight += 1
+            self.stats['admitted'] += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+
+    def record_service(self, elapsed_ms: float):
+        """Tempo de uma completion bem-sucedida, usado na previsão"""
+        with self._lock:
+            self.service_ms = elapsed_ms if self.service_ms is None else \
+                self.alpha * elapsed_ms + (1 - self.alpha) * self.service_ms
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            predicted = self._predict_ms()
+            return dict(
+                self.stats,
+                in_flight=self.in_flight,
+                service_ms=round(self.service_ms, 1) if self.service_ms is not None else None,
+                predicted_ms=round(predicted, 1) if predicted is not None else None,
+                slo_ms=self.slo_ms
+            )
+
+    def _predict_ms(self) -> Optional[float]:
+        if self.service_ms is None:
+            return None
+        # Ondas de atendimento até chegar a vez da nova requisição
+        waves = math.ceil((self.in_flight + 1) / max(self.capacity(), 1))
+        return waves * self.service_ms
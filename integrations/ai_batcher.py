@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+class MicroBatcher:
+    """Agrupa itens que chegam dentro de uma janela curta e os processa em uma única chamada.
+
+    O primeiro item abre a janela; ao fim dela (ou ao atingir max_batch) o lote é enviado
+    para process_batch, que deve devolver um resultado por item, na mesma ordem.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 window_ms: float = 25, max_batch: int = 4):
+        self.process_batch = process_batch
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._pending: List[tuple] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self.stats = {'items': 0, 'batches': 0, 'max_batch_seen': 0, 'errors': 0}
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Enfileira um item e bloqueia até o resultado do lote em que ele entrou"""
+        future = Future()
+        batch = None
+        with self._lock:
+            self._pending.append((item, future))
+            self.stats['items'] += 1
+            if len(self._pending) >= self.max_batch:
+                batch = self._take_batch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        # Lote cheio: processa na thread de quem completou o lote
+        if batch:
+            self._run(batch)
+        return future.result(timeout)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats, window_ms=self.window * 1000, max_batch=self.max_batch)
+        stats['avg_batch_size'] = round(stats['items'] / stats['batches'], 2) if stats['batches'] else 0.0
+        return stats
+
+    def _take_batch(self) -> List[tuple]:
+        batch, self._pending = self._pending, []
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.stats['batches'] += 1
+        self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(batch))
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take_batch() if self._pending else None
+            self._timer = None
+        if batch:
+            self._run(batch)
+
+    def _run(self, batch: List[tuple]):
+        try:
+            results = self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            print(f"⚠️ MicroBatcher: falha ao processar lote de {len(batch)}: {type(e).__name__}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+            results = [None] * len(batch)
+
+        for index, (_, future) in enumerate(batch):
+            future.set_result(results[index] if index < len(results) else None)
@@ -0,0 +1,207 @@
+import atexit
+import sqlite3
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+DURATION_BUCKETS = [15, 30, 60, 90, 120, 240]
+
+def duration_bucket(minutes) -> int:
+    """Agrupa a duração estimada na menor faixa que a comporta"""
+    try:
+        minutes = float(minutes)
+    except (TypeError, ValueError):
+        minutes = 60
+    for bucket in DURATION_BUCKETS:
+        if minutes <= bucket:
+            return bucket
+    return DURATION_BUCKETS[-1] + 1
+
+def suggestion_fingerprint(task_data: Dict) -> str:
+    """Chave normalizada do prompt: categoria, prioridade e faixa de duração"""
+    category = (task_data.get('category') or 'Development').strip().lower()
+    priority = (task_data.get('priority') or 'Média').strip().lower()
+    return f"schedule:{category}|{priority}|{duration_bucket(task_data.get('estimated_time', 60))}"
+
+class SuggestionCache:
+    """Cache LRU + TTL das respostas do LocalAI, persistido em SQLite.
+
+    Um hit não escreve no banco: last_used_at e hits ficam em memória e são gravados
+    em lote a cada flush_every hits, junto com o próximo put ou no encerramento.
+    """
+
+    def __init__(self, db_path: str = "chronos_knowledge.db", max_entries: int = 500, ttl: float = 86400,
+                 flush_every: int = 50):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self._entries: OrderedDict = OrderedDict()
+        self._touched: Dict[str, tuple] = {}  # fingerprint -> (last_used_at, hits desde o último flush)
+        self._pending_hits = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'expired': 0}
+        self.init_cache_table()
+        self._load()
+        atexit.register(self.flush)
+
+    def init_cache_table(self):
+        """Inicializa tabela do cache"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ai_response_cache (
+                fingerprint TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                anchor_date TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        """Carrega as entradas válidas, da menos para a mais recentemente usada"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM ai_response_cache WHERE created_at < ?', (time.time() - self.ttl,))
+        cursor.execute('''
+            SELECT fingerprint, response, anchor_date, created_at FROM ai_response_cache
+            ORDER BY last_used_at DESC LIMIT ?
+        ''', (self.max_entries,))
+        rows = cursor.fetchall()
+        conn.commit()
+        conn.close()
+
+        for fingerprint, response, anchor_date, created_at in reversed(rows):
+            self._entries[fingerprint] = (json.loads(response), anchor_date, created_at)
+
+    def get(self, task_data: Dict, now: Optional[datetime] = None) -> Optional[Dict]:
+        """Resposta em cache para a tarefa, com horários re-ancorados no dia atual"""
+        fingerprint = suggestion_fingerprint(task_data)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry and time.time() - entry[2] > self.ttl:
+                del self._entries[fingerprint]
+                self.stats['expired'] += 1
+                entry = None
+            if not entry:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.stats['hits'] += 1
+            hits = self._touched.get(fingerprint, (0, 0))[1]
+            self._touched[fingerprint] = (time.time(), hits + 1)
+            self._pending_hits += 1
+            should_flush = self._pending_hits >= self.flush_every
+
+        if should_flush:
+            self.flush()
+        response, anchor_date, _ = entry
+        result = self._reanchor(response, date.fromisoformat(anchor_date), now or datetime.now())
+        if 'estimated_time' in task_data:
+            result['duration_minutes'] = task_data['estimated_time']
+        return result
+
+    def contains(self, task_data: Dict) -> bool:
+        """Há entrada válida para a tarefa (sem contar como hit/miss)"""
+        fingerprint = suggestion_fingerprint(task_data)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            return entry is not None and time.time() - entry[2] <= self.ttl
+
+    def put(self, task_data: Dict, response: Dict):
+        """Armazena a resposta do modelo para a chave normalizada da tarefa"""
+        fingerprint = suggestion_fingerprint(task_data)
+        anchor_date = date.today().isoformat()
+        created_at = time.time()
+        evicted = []
+        with self._lock:
+            self._entries[fingerprint] = (response, anchor_date, created_at)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            self.stats['stores'] += 1
+            self.stats['evictions'] += len(evicted)
+            # A linha regravada zera os hits e as removidas somem: o resto vai no mesmo commit
+            touched = self._take_touched()
+            for stale in [fingerprint, *evicted]:
+                touched.pop(stale, None)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        self._write_touched(cursor, touched)
+        cursor.execute('''
+            INSERT OR REPLACE INTO ai_response_cache
+            (fingerprint, response, anchor_date, created_at, last_used_at, hits)
+            VALUES (?, ?, ?, ?, ?, 0)
+        ''', (fingerprint, json.dumps(response), anchor_date, created_at, created_at))
+        cursor.executemany('DELETE FROM ai_response_cache WHERE fingerprint = ?', [(f,) for f in evicted])
+        conn.commit()
+        conn.close()
+
+    def invalidate(self):
+        """Remove todas as entradas (ex.: padrões do usuário mudaram)"""
+        with self._lock:
+            self._entries.clear()
+            self._take_touched()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM ai_response_cache')
+        conn.commit()
+        conn.close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries), max_entries=self.max_entries, ttl=self.ttl)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def flush(self):
+        """Grava em lote o uso acumulado em memória (last_used_at e hits)"""
+        with self._lock:
+            touched = self._take_touched()
+        if not touched:
+            return
+        conn = sqlite3.connect(self.db_path)
+        self._write_touched(conn.cursor(), touched)
+        conn.commit()
+        conn.close()
+
+    def _take_touched(self) -> Dict[str, tuple]:
+        """Retira o uso pendente (chamar com o lock)"""
+        touched, self._touched = self._touched, {}
+        self._pending_hits = 0
+        return touched
+
+    @staticmethod
+    def _write_touched(cursor, touched: Dict[str, tuple]):
+        cursor.executemany('''
+            UPDATE ai_response_cache SET last_used_at = MAX(last_used_at, ?), hits = hits + ?
+            WHERE fingerprint = ?
+        ''', [(last_used_at, hits, fingerprint) for fingerprint, (last_used_at, hits) in touched.items()])
+
+    @staticmethod
+    def _reanchor(response: Dict, anchor_date: date, now: datetime) -> Dict:
+        """Mantém o horário e o deslocamento em dias da resposta original, a partir de hoje"""
+        result = dict(response)
+        try:
+            original = datetime.fromisoformat(response['scheduled_datetime'])
+        except (KeyError, TypeError, ValueError):
+            return result
+
+        day_offset = (original.date() - anchor_date).days
+        scheduled = datetime.combine(now.date() + timedelta(days=max(day_offset, 0)), original.time())
+        if scheduled < now:
+            scheduled += timedelta(days=1)
+
+        result['scheduled_datetime'] = scheduled.isoformat()
+        result['cached'] = True
+        return result
@@ -0,0 +1,72 @@
+import sqlite3
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class LateSuggestionLog:
+    """Registro (SQLite) das sugestões do LLM que perderam o prazo para a heurística"""
+
+    def __init__(self, db_path: str = "chronos_knowledge.db"):
+        self.db_path = db_path
+        self.init_log_table()
+
+    def init_log_table(self):
+        """Inicializa tabela de sugestões atrasadas"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ai_late_suggestions (
+                id INTEGER PRIMARY KEY,
+                task_title TEXT,
+                category TEXT,
+                priority TEXT,
+                budget_ms REAL NOT NULL,
+                elapsed_ms REAL NOT NULL,
+                heuristic_suggestion TEXT NOT NULL,
+                llm_suggestion TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def record(self, task_data: Dict, budget_ms: float, elapsed_ms: float,
+               heuristic: Dict, llm: Optional[Dict]):
+        """Guarda a heurística servida e a resposta tardia do LLM (None se falhou)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO ai_late_suggestions
+            (task_title, category, priority, budget_ms, elapsed_ms, heuristic_suggestion, llm_suggestion, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            task_data.get('title'), task_data.get('category'), task_data.get('priority'),
+            budget_ms, elapsed_ms, json.dumps(heuristic), json.dumps(llm) if llm else None, datetime.now()
+        ))
+        conn.commit()
+        conn.close()
+
+    def get_recent(self, limit: int = 20) -> List[Dict]:
+        """Últimas comparações heurística x LLM"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT task_title, category, priority, budget_ms, elapsed_ms,
+                   heuristic_suggestion, llm_suggestion, created_at
+            FROM ai_late_suggestions ORDER BY id DESC LIMIT ?
+        ''', (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [{
+            'task_title': row[0],
+            'category': row[1],
+            'priority': row[2],
+            'budget_ms': row[3],
+            'elapsed_ms': row[4],
+            'heuristic_suggestion': json.loads(row[5]),
+            'llm_suggestion': json.loads(row[6]) if row[6] else None,
+            'created_at': row[7]
+        } for row in rows]
@@ -0,0 +1,146 @@
+import json
+from typing import Any, Dict, Optional
+
+SUGGESTION_SCHEMA = {
+    "type": "object",
+    "required": ["scheduled_datetime", "confidence_score", "reasoning"],
+    "properties": {
+        "scheduled_datetime": {"type": "string"},
+        "confidence_score": {"type": "number"},
+        "reasoning": {"type": "string"},
+        "duration_minutes": {"type": "integer"}
+    }
+}
+
+# Esquema de saída e orçamento de tokens por tipo de prompt
+OUTPUT_SPECS = {
+    'scheduling': {
+        'schema': SUGGESTION_SCHEMA,
+        'max_tokens': 160
+    },
+    'scheduling_batch': {
+        'schema': {
+            "type": "array",
+            "items": dict(SUGGESTION_SCHEMA, properties=dict(SUGGESTION_SCHEMA['properties'], task={"type": "integer"}))
+        },
+        'max_tokens': 60,
+        'max_tokens_per_item': 120
+    },
+    'pattern': {
+        'schema': {"type": "object"},
+        'max_tokens': 400
+    },
+    'feedback': {
+        'schema': {"type": "object"},
+        'max_tokens': 300
+    },
+    'optimization': {
+        'schema': {
+            "type": "object",
+            "properties": {
+                "workload_analysis": {"type": "object"},
+                "recommendations": {"type": "array", "items": {"type": "string"}}
+            }
+        },
+        'max_tokens': 400
+    }
+}
+
+# Prefixo fixo (regras + esquema) enviado como mensagem de sistema em toda chamada:
+# idêntico byte a byte entre requisições para o servidor reaproveitar o prompt cache
+SYSTEM_PREFIX = (
+    "Você é o agendador do CHRONOS. Responda somente JSON válido, sem texto extra.\n"
+    "Sugestão: " + json.dumps(SUGGESTION_SCHEMA['properties'], separators=(',', ':'), sort_keys=True) + "\n"
+    "Regras: datas ISO 8601 locais; confidence_score entre 0 e 1; reasoning com até 15 palavras; "
+    "várias tarefas numeradas -> array na mesma ordem, com o campo task."
+)
+
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'boolean': bool,
+    'number': (int, float),
+    'integer': int,
+}
+
+class JsonObjectScanner:
+    """Acompanha texto em streaming e detecta quando o primeiro objeto (ou array) JSON fecha"""
+
+    def __init__(self, openers: str = '{['):
+        self.openers = openers
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.consumed = 0
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Consome um trecho; retorna o índice (no texto acumulado) logo após o valor fechar"""
+        for i, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif not self.started:
+                if char in self.openers:
+                    self.depth = 1
+                    self.started = True
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    end = self.consumed + i + 1
+                    self.consumed += len(chunk)
+                    return end
+        self.consumed += len(chunk)
+        return None
+
+def openers_for(spec: Dict) -> str:
+    """Caractere que abre o valor esperado pelo esquema"""
+    return '[' if spec['schema'].get('type') == 'array' else '{'
+
+def response_format_for(spec: Dict, mode: str) -> Optional[Dict]:
+    """response_format da API compatível com OpenAI ('schema', 'json' ou 'off')"""
+    if mode == 'schema':
+        return {"type": "json_schema", "json_schema": {"name": "chronos_output", "schema": spec['schema']}}
+    if mode == 'json' and spec['schema'].get('type') == 'object':
+        return {"type": "json_object"}
+    return None
+
+def matches_schema(value: Any, schema: Dict) -> bool:
+    """Validação mínima: type, required, properties e items"""
+    expected = _JSON_TYPES.get(schema.get('type'))
+    if expected and (not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool)):
+        if not (schema.get('type') == 'integer' and isinstance(value, float) and value.is_integer()):
+            return False
+
+    if isinstance(value, dict):
+        if any(key not in value for key in schema.get('required', [])):
+            return False
+        for key, sub_schema in schema.get('properties', {}).items():
+            if key in value and value[key] is not None and not matches_schema(value[key], sub_schema):
+                return False
+    elif isinstance(value, list) and 'items' in schema:
+        return all(matches_schema(item, schema['items']) for item in value)
+    return True
+
+def parse_output(text: str, spec: Dict) -> Optional[Any]:
+    """Decodifica o primeiro valor JSON do tipo esperado (raw_decode) e valida contra o esquema"""
+    opener = openers_for(spec)
+    decoder = json.JSONDecoder()
+    start = text.find(opener)
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+        except ValueError:
+            start = text.find(opener, start + 1)
+            continue
+        return value if matches_schema(value, spec['schema']) else None
+    return None
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from integrations.circuit_breaker import CircuitOpenError, get_breaker
+
+class Endpoint:
+    """Instância do LocalAI com contadores de carga, latência (EWMA), saúde e circuit breaker próprio"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.chat_url = f"{self.base_url}/chat/completions"
+        self.outstanding = 0
+        self.ewma_ms: Optional[float] = None
+        self.calls = 0
+        self.samples = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.breaker = get_breaker(f"localai:{self.base_url}", env_prefix='AI')
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until and not self.breaker.is_open()
+
+    def snapshot(self, now: float) -> Dict:
+        return {
+            'base_url': self.base_url,
+            'outstanding': self.outstanding,
+            'ewma_ms': round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            'calls': self.calls,
+            'failures': self.failures,
+            'healthy': self.is_available(now),
+            'ejected_for': round(max(self.ejected_until - now, 0.0), 1),
+            'ejections': self.ejections,
+            'breaker': self.breaker.state
+        }
+
+class EndpointRouter:
+    """Roteia chamadas para a instância com menos requisições em andamento.
+
+    Empates são decididos pela menor latência EWMA. Instâncias com falhas consecutivas
+    ou muito mais lentas que a melhor são ejetadas por eject_seconds; cada instância tem o
+    seu circuit breaker, e uma com o circuito aberto também fica de fora.
+    """
+
+    def __init__(self, base_urls: List[str], alpha: float = 0.3, slow_factor: float = 3.0,
+                 eject_seconds: float = 30.0, max_failures: int = 2, min_samples: int = 5):
+        self.endpoints = [Endpoint(url) for url in base_urls]
+        self.alpha = alpha
+        self.slow_factor = slow_factor
+        self.eject_seconds = eject_seconds
+        self.max_failures = max_failures
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint: Optional[Endpoint] = None) -> Optional[Endpoint]:
+        """Escolhe uma instância (ou usa a indicada) admitida pelo seu breaker e conta a requisição
+        como em andamento. None quando nenhuma está disponível: quem chama usa a heurística."""
+        now = time.monotonic()
+        with self._lock:
+            if endpoint is not None:
+                candidates = [endpoint]
+            else:
+                candidates = sorted((e for e in self.endpoints if e.is_available(now)),
+                                    key=lambda e: (e.outstanding, e.ewma_ms or 0.0))
+            for candidate in candidates:
+                try:
+                    candidate.breaker.before_call()
+                except CircuitOpenError:
+                    continue  # Sonda do meio-aberto já em andamento nesta instância
+                candidate.outstanding += 1
+                return candidate
+            return None
+
+    def has_available(self) -> bool:
+        """Alguma instância fora da ejeção e com o circuito fechado ou meio-aberto"""
+        now = time.monotonic()
+        with self._lock:
+            return any(e.is_available(now) for e in self.endpoints)
+
+    def release(self, endpoint: Endpoint, elapsed: float, success: bool):
+        """Registra o resultado da chamada e ejeta a instância se necessário"""
+        now = time.monotonic()
+        with self._lock:
+            endpoint.outstanding = max(endpoint.outstanding - 1, 0)
+            endpoint.calls += 1
+
+            if not success:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.max_failures:
+                    self._eject(endpoint, now, f"{endpoint.consecutive_failures} falhas seguidas")
+                return
+
+            endpoint.consecutive_failures = 0
+            endpoint.samples += 1
+            elapsed_ms = elapsed * 1000
+            endpoint.ewma_ms = elapsed_ms if endpoint.ewma_ms is None else \
+                self.alpha * elapsed_ms + (1 - self.alpha) * endpoint.ewma_ms
+
+            others = [e.ewma_ms for e in self.endpoints
+                      if e is not endpoint and e.ewma_ms is not None and e.is_available(now)]
+            if endpoint.samples >= self.min_samples and others and endpoint.ewma_ms > self.slow_factor * min(others):
+                self._eject(endpoint, now, f"EWMA {endpoint.ewma_ms:.0f}ms vs {min(others):.0f}ms")
+
+    def snapshot(self) -> List[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [endpoint.snapshot(now) for endpoint in self.endpoints]
+
+    def _eject(self, endpoint: Endpoint, now: float, reason: str):
+        endpoint.ejected_until = now + self.eject_seconds
+        endpoint.ejections += 1
+        endpoint.consecutive_failures = 0
+        # Esquece a latência antiga: ao voltar, a instância é reavaliada do zero
+        endpoint.ewma_ms = None
+        endpoint.samples = 0
+        print(f"🚫 LocalAI {endpoint.base_url} ejetado por {self.eject_seconds:g}s ({reason})")
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(ConnectionError):
+    """Chamada recusada sem tocar a rede: o circuito do backend está aberto"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuito '{name}' aberto - nova tentativa em {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Circuit breaker (fechado/aberto/meio-aberto) por backend.
+
+    Após failure_threshold falhas consecutivas o circuito abre e recusa chamadas por
+    cooldown segundos; depois deixa passar até half_open_max sondas. Uma sonda bem-sucedida
+    fecha o circuito, uma falha reabre.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0, half_open_max: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.half_open_max = max(1, half_open_max)
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def before_call(self):
+        """Levanta CircuitOpenError se a chamada não deve ser feita agora"""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.cooldown - time.monotonic()
+                if remaining > 0:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = HALF_OPEN
+                self._probes = 0
+                print(f"🟡 Circuito '{self.name}': meio-aberto - testando backend")
+
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_max:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes += 1
+
+    def is_open(self) -> bool:
+        """True enquanto o circuito está aberto e o cooldown não terminou"""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() < self._opened_at + self.cooldown
+
+    def record_success(self):
+        with self._lock:
+            self.stats['successes'] += 1
+            self._failures = 0
+            if self.state != CLOSED:
+                print(f"🟢 Circuito '{self.name}': fechado - backend respondeu")
+            self.state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.stats['failures'] += 1
+            self._failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self.stats['opened'] += 1
+                print(f"🔴 Circuito '{self.name}': aberto após {self._failures} falha(s) - "
+                      f"chamadas recusadas por {self.cooldown:g}s")
+
+    def snapshot(self) -> Dict:
+        """Estado atual para diagnóstico"""
+        with self._lock:
+            retry_in = max(self._opened_at + self.cooldown - time.monotonic(), 0.0) if self.state == OPEN else 0.0
+            return dict(
+                self.stats,
+                state=self.state,
+                consecutive_failures=self._failures,
+                failure_threshold=self.failure_threshold,
+                cooldown=self.cooldown,
+                retry_in=round(retry_in, 1)
+            )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, env_prefix: Optional[str] = None) -> CircuitBreaker:
+    """Breaker compartilhado do processo; limites lidos de <PREFIXO>_BREAKER_THRESHOLD/_COOLDOWN"""
+    with _breakers_lock:
+        if name not in _breakers:
+            prefix = env_prefix or name.upper()
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv(f'{prefix}_BREAKER_THRESHOLD', '5')),
+                cooldown=float(os.getenv(f'{prefix}_BREAKER_COOLDOWN', '30'))
+            )
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict]:
+    """Estado de todos os breakers registrados"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
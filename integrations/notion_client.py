@@ -1,6 +1,75 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import os
+import threading
+import time
 import requests
-from typing import Dict, List, Optional
+from urllib3.exceptions import NewConnectionError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from integrations.circuit_breaker import CircuitOpenError
+from integrations.notion_coalescer import UpdateCoalescer
+from integrations.notion_transport import get_transport
+
+class SchemaCache:
+    """Cache de schema dos databases, compartilhado entre instâncias do processo"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+    
+    def get(self, database_id: str) -> Optional[Dict]:
+        """Retorna as propriedades em cache se ainda dentro do TTL"""
+        with self._lock:
+            entry = self._entries.get(database_id)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+    
+    def get_or_load(self, database_id: str, loader: Callable[[], Optional[Dict]]) -> Dict:
+        """Retorna o schema do cache ou carrega uma única vez (sem requisições duplicadas)"""
+        cached = self.get(database_id)
+        if cached is not None:
+            return cached
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(database_id, threading.Lock())
+        
+        with load_lock:
+            cached = self.get(database_id)
+            if cached is not None:
+                return cached
+            
+            properties = loader()
+            if properties is None:
+                return {}  # Falhas não são cacheadas
+            
+            with self._lock:
+                self._entries[database_id] = (time.monotonic(), properties)
+            return properties
+    
+    def invalidate(self, database_id: Optional[str] = None):
+        """Remove o schema de um database (ou de todos) do cache"""
+        with self._lock:
+            if database_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(database_id, None)
+
+
+schema_cache = SchemaCache(ttl=float(os.getenv('NOTION_SCHEMA_TTL', '300')))
+
+# Propriedade rich_text com o task_ref local: torna a criação verificável antes de um reenvio
+REF_PROPERTY = "Chronos Ref"
+
+def _request_not_sent(error: Exception) -> bool:
+    """Falha antes de a requisição sair (circuito aberto, sem conexão): reenviar não duplica"""
+    if isinstance(error, (CircuitOpenError, requests.exceptions.ConnectTimeout)):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
 
 class NotionClient:
     """Cliente para integração com Notion API"""
@@ -8,128 +77,280 @@ class NotionClient:
     def __init__(self, token: str, database_id: str):
         self.token = token
         self.database_id = database_id
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"
-        }
-        self.base_url = "https://api.notion.com/v1"
-        self.title_property_name = None  # Will be detected on first use
+        self.transport = get_transport(token)
+        self.headers = self.transport.headers
+        self.base_url = self.transport.base_url
+        self.title_property_name = None  # Detectado a partir do schema em cache
+        self.day_cache_ttl = float(os.getenv('NOTION_DAY_CACHE_TTL', '60'))
+        self._day_cache: Dict[str, tuple] = {}
+        self._day_cache_lock = threading.Lock()
+        self.updates = UpdateCoalescer(self.update_task, window=float(os.getenv('NOTION_UPDATE_WINDOW', '2')))
     
     def get_tasks(self, days_back: int = 30) -> List[Dict]:
         """Busca tarefas do Notion"""
-        url = f"{self.base_url}/databases/{self.database_id}/query"
+        return list(self.iter_tasks(days_back))
+    
+    def iter_tasks(self, days_back: int = 30, page_size: int = 100,
+                   query: Optional[Dict] = None, strict: bool = False) -> Iterator[Dict]:
+        """Itera tarefas do Notion seguindo next_cursor sob demanda (memória constante).
+
+        Uma página de resultados que falha encerra a iteração; com strict levanta ConnectionError,
+        para quem precisa distinguir uma leitura completa de uma interrompida.
+        """
+        if query is None:
+            query = {
+                "filter": {
+                    "property": "Created",
+                    "date": {
+                        "after": (datetime.now() - timedelta(days=days_back)).isoformat()
+                    }
+                },
+                "sorts": [{"property": "Created", "direction": "descending"}]
+            }
         
-        filter_payload = {
-            "filter": {
-                "property": "Created",
-                "date": {
-                    "after": (datetime.now() - timedelta(days=days_back)).isoformat()
-                }
-            },
-            "sorts": [{"property": "Created", "direction": "descending"}]
-        }
+        payload = dict(query)
+        payload["page_size"] = max(1, min(page_size, 100))
         
+        while True:
+            page = self._query_database_page(payload)
+            if page is None:
+                if strict:
+                    raise ConnectionError("consulta ao database do Notion interrompida")
+                return
+            
+            for result in page.get('results', []):
+                task = self._extract_task_data(result)
+                if task:
+                    yield task
+            
+            if not page.get('has_more') or not page.get('next_cursor'):
+                return
+            payload["start_cursor"] = page['next_cursor']
+    
+    def _query_database_page(self, payload: Dict) -> Optional[Dict]:
+        """Busca uma página de resultados de databases/{id}/query"""
         try:
-            response = requests.post(url, headers=self.headers, json=filter_payload)
+            response = self.transport.post(f"databases/{self.database_id}/query", json=payload)
             if response.status_code == 200:
-                return self._parse_notion_response(response.json())
+                return response.json()
+            elif response.status_code == 429:
+                print(f"🚦 Notion: Rate limit excedido após retries")
             elif response.status_code == 401:
                 print(f"🔐 Notion: Token de autenticação inválido ou expirado")
-                return []
             elif response.status_code == 400:
                 print(f"📋 Notion: Configuração de database incorreta (ID: {self.database_id[:8]}...)")
-                return []
             elif response.status_code == 404:
                 print(f"🔍 Notion: Database não encontrado ou sem acesso")
-                return []
             else:
                 print(f"🌐 Notion API erro {response.status_code}: {response.text[:100]}")
-                return []
         except requests.exceptions.ConnectionError:
             print(f"🔌 Notion: Falha de conexão - verifique internet")
-            return []
         except requests.exceptions.Timeout:
             print(f"⏱️ Notion: Timeout na requisição")
-            return []
         except Exception as e:
             print(f"⚠️ Notion erro inesperado: {type(e).__name__}: {str(e)[:100]}")
-            return []
+        return None
     
     def create_task(self, task_data: Dict, schedule_info: Dict) -> Optional[str]:
         """Cria nova tarefa no Notion"""
-        url = f"{self.base_url}/pages"
+        task_id, _, _ = self._create_page(self._build_task_properties(task_data, schedule_info))
+        if task_id:
+            self.invalidate_day_cache(schedule_info.get('scheduled_datetime'))
+        return task_id
+    
+    def create_tasks(self, batch: List[Tuple[Dict, Dict]], max_workers: Optional[int] = None) -> List[Dict]:
+        """Cria várias tarefas em paralelo (limitado pelo rate limit do transporte).
+        
+        Recebe pares (task_data, schedule_info) e retorna um resultado por item, na mesma ordem.
+        ambiguous indica uma falha em que a página pode ter sido criada (timeout ou 5xx após o envio);
+        verifiable, que a requisição levava o task_ref (schedule_info['task_id']) em REF_PROPERTY.
+        """
+        if not batch:
+            return []
+        
+        # Uma única consulta de schema para o lote inteiro
+        existing_properties = self._get_existing_properties()
+        if max_workers is None:
+            max_workers = max(1, round(self.transport.limiter.rate))
+        max_workers = min(max_workers, len(batch), self.transport.pool_size)
         
+        def create(index: int, task_data: Dict, schedule_info: Dict) -> Dict:
+            properties = self._build_task_properties(task_data, schedule_info, existing_properties)
+            task_id, error, ambiguous = self._create_page(properties)
+            if task_id:
+                self.invalidate_day_cache(schedule_info.get('scheduled_datetime'))
+            return {'index': index, 'success': task_id is not None, 'task_id': task_id, 'error': error,
+                    'ambiguous': ambiguous, 'verifiable': REF_PROPERTY in properties}
+        
+        print(f"📦 Notion: criando {len(batch)} tarefa(s) com até {max_workers} requisições simultâneas")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notion-bulk") as executor:
+            futures = [
+                executor.submit(create, index, task_data, schedule_info)
+                for index, (task_data, schedule_info) in enumerate(batch)
+            ]
+            results = []
+            for index, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'index': index, 'success': False, 'task_id': None, 'error': str(e),
+                                    'ambiguous': True, 'verifiable': False})
+        
+        created = sum(1 for result in results if result['success'])
+        print(f"📦 Notion: {created}/{len(batch)} tarefa(s) criada(s)")
+        return results
+    
+    def find_page_by_ref(self, task_ref: str) -> Optional[str]:
+        """Page id da tarefa criada com este task_ref; levanta ConnectionError se a consulta falhar"""
+        page = self._query_database_page({
+            "filter": {"property": REF_PROPERTY, "rich_text": {"equals": task_ref}},
+            "page_size": 1
+        })
+        if page is None:
+            raise ConnectionError("consulta por referência no Notion falhou")
+        results = page.get('results', [])
+        return results[0]['id'] if results else None
+    
+    def _create_page(self, properties: Dict) -> Tuple[Optional[str], Optional[str], bool]:
+        """Cria a página no database; retorna (task_id, erro, ambíguo).
+
+        POST /pages não é idempotente: ambíguo é a falha em que a página pode ter sido criada
+        (timeout de leitura, conexão perdida após o envio ou 5xx).
+        """
         payload = {
             "parent": {"database_id": self.database_id},
-            "properties": self._build_task_properties(task_data, schedule_info)
+            "properties": properties
         }
         
-        
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self.transport.post("pages", json=payload)
             if response.status_code == 200:
                 task_id = response.json()['id']
                 print(f"✅ Tarefa criada no Notion: {task_id}")
-                return task_id
+                return task_id, None, False
             else:
                 print(f"❌ Erro ao criar tarefa: {response.status_code}")
                 try:
                     error_detail = response.json()
                     print(f"📋 Detalhes do erro: {error_detail}")
                 except:
-                    print(f"📋 Resposta do erro: {response.text[:200]}")
-                return None
+                    error_detail = response.text[:200]
+                    print(f"📋 Resposta do erro: {error_detail}")
+                self._invalidate_schema_on_validation_error(response)
+                return None, f"HTTP {response.status_code}: {error_detail}", response.status_code >= 500
         except Exception as e:
             print(f"❌ Erro na criação: {e}")
-            return None
+            return None, str(e), not _request_not_sent(e)
     
     def update_task(self, task_id: str, updates: Dict) -> bool:
         """Atualiza tarefa existente"""
-        url = f"{self.base_url}/pages/{task_id}"
-        
         payload = {"properties": self._build_update_properties(updates)}
+        if not payload["properties"]:
+            return True  # Nenhuma propriedade existente no database para atualizar
         
         try:
-            response = requests.patch(url, headers=self.headers, json=payload)
+            response = self.transport.patch(f"pages/{task_id}", json=payload)
+            self._invalidate_schema_on_validation_error(response)
+            if response.status_code == 200:
+                self.invalidate_day_cache()  # Não sabemos o dia da página atualizada
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Erro na atualização: {e}")
             return False
     
+    def queue_update(self, task_id: str, updates: Dict):
+        """Enfileira uma atualização; PATCHes da mesma página na janela viram um só"""
+        self.updates.submit(task_id, updates)
+    
+    def close(self):
+        """Envia atualizações pendentes"""
+        self.updates.close()
+    
     def get_today_tasks(self) -> List[Dict]:
         """Busca tarefas agendadas para hoje"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        # Implementa filtro por data
-        return self.get_tasks(1)  # Simplificado
+        return self.get_tasks_for_day(datetime.now().date())
+    
+    def get_tasks_for_day(self, day: date) -> List[Dict]:
+        """Tarefas agendadas para um dia, com cache em memória por dia (TTL curto)"""
+        key = day.isoformat()
+        with self._day_cache_lock:
+            entry = self._day_cache.get(key)
+        if entry and time.monotonic() - entry[0] < self.day_cache_ttl:
+            return list(entry[1])
+        
+        start = datetime.combine(day, datetime.min.time())
+        tasks = self.get_tasks_between(start, start + timedelta(days=1))
+        with self._day_cache_lock:
+            self._day_cache[key] = (time.monotonic(), tasks)
+        return list(tasks)
     
-    def _get_title_property_name(self) -> str:
+    def get_tasks_between(self, start: datetime, end: datetime) -> List[Dict]:
+        """Tarefas com Scheduled Time em [start, end), filtradas no servidor.
+
+        Limites sem fuso são hora local (como no espelho); o Notion leria um valor sem fuso como UTC.
+        """
+        query = {
+            "filter": {
+                "and": [
+                    {"property": "Scheduled Time", "date": {"on_or_after": start.astimezone().isoformat()}},
+                    {"property": "Scheduled Time", "date": {"before": end.astimezone().isoformat()}}
+                ]
+            },
+            "sorts": [{"property": "Scheduled Time", "direction": "ascending"}]
+        }
+        return list(self.iter_tasks(query=query))
+    
+    def invalidate_day_cache(self, scheduled: Optional[str] = None):
+        """Descarta o cache do dia de um horário agendado (ou todo o cache)"""
+        with self._day_cache_lock:
+            if scheduled:
+                self._day_cache.pop(scheduled[:10], None)
+            else:
+                self._day_cache.clear()
+    
+    def _get_title_property_name(self, schema: Optional[Dict] = None) -> str:
         """Detecta automaticamente qual propriedade é o title do database"""
-        if self.title_property_name is not None:
-            return self.title_property_name
+        if schema is None:
+            schema = self._get_database_schema()
+        for prop_name, prop_info in schema.items():
+            if prop_info.get("type") == "title":
+                if prop_name != self.title_property_name:
+                    print(f"🔍 Propriedade title detectada: '{prop_name}'")
+                self.title_property_name = prop_name
+                return prop_name
         
+        # Fallback se não encontrar
+        if self.title_property_name != "Name":
+            print("⚠️ Propriedade title não encontrada, usando 'Name' como fallback")
+        self.title_property_name = "Name"
+        return "Name"
+    
+    def _get_database_schema(self) -> Dict:
+        """Propriedades do database, servidas do cache compartilhado (TTL)"""
+        return schema_cache.get_or_load(self.database_id, self._fetch_database_schema)
+    
+    def _fetch_database_schema(self) -> Optional[Dict]:
+        """Busca o schema do database na API (None em caso de falha)"""
         try:
-            response = requests.get(f"{self.base_url}/databases/{self.database_id}", headers=self.headers)
+            response = self.transport.get(f"databases/{self.database_id}")
             if response.status_code == 200:
-                db_data = response.json()
-                properties = db_data.get("properties", {})
-                
-                # Encontra a propriedade title
-                for prop_name, prop_info in properties.items():
-                    if prop_info.get("type") == "title":
-                        self.title_property_name = prop_name
-                        print(f"🔍 Propriedade title detectada: '{prop_name}'")
-                        return prop_name
-            
-            # Fallback se não encontrar
-            print("⚠️ Propriedade title não encontrada, usando 'Name' como fallback")
-            self.title_property_name = "Name"
-            return "Name"
-            
+                return response.json().get("properties", {})
+            print(f"⚠️ Erro ao obter schema do database: {response.status_code}")
         except Exception as e:
-            print(f"❌ Erro ao detectar propriedade title: {e}")
-            self.title_property_name = "Name"
-            return "Name"
+            print(f"⚠️ Erro ao obter propriedades: {e}")
+        return None
+    
+    def _invalidate_schema_on_validation_error(self, response: requests.Response):
+        """Descarta o schema em cache quando o Notion rejeita as propriedades enviadas"""
+        if response.status_code != 400:
+            return
+        try:
+            code = response.json().get('code')
+        except ValueError:
+            return
+        if code == 'validation_error':
+            print(f"🔄 Notion: schema em cache invalidado após erro de validação")
+            schema_cache.invalidate(self.database_id)
     
     def _parse_notion_response(self, response: Dict) -> List[Dict]:
         """Parse da resposta do Notion"""
@@ -156,7 +377,9 @@ class NotionClient:
                 'due_date': self._extract_date(properties, 'Due Date'),
                 'scheduled_time': self._extract_date(properties, 'Scheduled Time'),
                 'description': self._extract_rich_text(properties, 'Description'),
-                'tags': self._extract_multi_select(properties, 'Tags')
+                'tags': self._extract_multi_select(properties, 'Tags'),
+                'last_edited_time': page.get('last_edited_time'),
+                'archived': bool(page.get('archived') or page.get('in_trash'))
             }
         except Exception as e:
             print(f"❌ Erro ao extrair tarefa: {e}")
@@ -197,6 +420,8 @@ class NotionClient:
         try:
             if field in properties:
                 date_field = properties[field]
+                if date_field and date_field.get('created_time'):
+                    return date_field['created_time']  # "Created" pode ser do tipo created_time
                 if date_field and date_field.get('date') and date_field['date'].get('start'):
                     return date_field['date']['start']
         except (KeyError, TypeError, AttributeError) as e:
@@ -210,19 +435,21 @@ class NotionClient:
             return properties[field]['rich_text'][0]['text']['content']
         return ""
     
-    def _build_task_properties(self, task_data: Dict, schedule_info: Dict) -> Dict:
+    def _build_task_properties(self, task_data: Dict, schedule_info: Dict,
+                               existing_properties: Optional[Dict] = None) -> Dict:
         """Constrói propriedades para criação de tarefa"""
+        # Obtém lista de propriedades que existem no database
+        if existing_properties is None:
+            existing_properties = self._get_existing_properties()
+        
         # Detecta o nome correto da propriedade title
-        title_prop = self._get_title_property_name()
+        title_prop = self._get_title_property_name(existing_properties)
         
         # Propriedades básicas que sempre incluímos
         properties = {
             title_prop: {"title": [{"text": {"content": task_data.get('title', 'Nova Tarefa')}}]},
         }
         
-        # Obtém lista de propriedades que existem no database
-        existing_properties = self._get_existing_properties()
-        
         # Adiciona propriedades condicionalmente (apenas se existem)
         if "Category" in existing_properties:
             properties["Category"] = {"select": {"name": task_data.get('category', 'Other')}}
@@ -251,23 +478,20 @@ class NotionClient:
             if tags:
                 properties["Tags"] = {"multi_select": [{"name": tag} for tag in tags]}
         
+        if REF_PROPERTY in existing_properties and schedule_info.get('task_id'):
+            properties[REF_PROPERTY] = {"rich_text": [{"text": {"content": schedule_info['task_id']}}]}
+        
         print(f"🔨 Criando tarefa com {len(properties)} propriedades válidas")
         return properties
     
     def _get_existing_properties(self) -> Dict:
         """Obtém propriedades existentes no database"""
-        try:
-            response = requests.get(f"{self.base_url}/databases/{self.database_id}", headers=self.headers)
-            if response.status_code == 200:
-                db_data = response.json()
-                return db_data.get("properties", {})
-        except Exception as e:
-            print(f"⚠️ Erro ao obter propriedades: {e}")
-        return {}
+        return self._get_database_schema()
     
     def _build_update_properties(self, updates: Dict) -> Dict:
         """Constrói propriedades para atualização"""
         properties = {}
+        existing_properties = self._get_existing_properties()
         
         if 'status' in updates:
             properties['Status'] = {"select": {"name": updates['status']}}
@@ -278,4 +502,8 @@ class NotionClient:
         if 'feedback_rating' in updates:
             properties['User Rating'] = {"number": updates['feedback_rating']}
         
+        # Sem schema disponível, envia tudo e deixa o Notion validar
+        if existing_properties:
+            properties = {name: value for name, value in properties.items() if name in existing_properties}
+        
         return properties
@@ -0,0 +1,142 @@
+import atexit
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+class UpdateCoalescer:
+    """Agrupa atualizações de propriedades por página e envia um único PATCH por janela.
+
+    Atualizações da mesma página recebidas dentro da janela são mescladas na ordem
+    de chegada (a última escrita vence). Os envios de uma mesma página são serializados
+    (por um conjunto fixo de locks listrados), então uma mescla nunca ultrapassa outra
+    mais antiga. Após max_failures falhas a mescla vai para on_failed (ex.: o outbox
+    durável) em vez de ser descartada.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, send: Callable[[str, Dict], bool], window: float = 2.0, max_failures: int = 3,
+                 on_failed: Optional[Callable[[str, Dict], object]] = None):
+        self.send = send
+        self.window = window
+        self.max_failures = max_failures
+        self.on_failed = on_failed
+        self._pending: Dict[str, Dict] = {}
+        self._failures: Dict[str, int] = {}
+        self._first_seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._page_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._worker = None
+        self.stats = {'submitted': 0, 'sent': 0, 'failed': 0, 'handed_off': 0}
+        atexit.register(self.close)
+
+    def submit(self, page_id: str, updates: Dict):
+        """Registra atualizações para uma página; enviadas ao fim da janela"""
+        with self._lock:
+            self._pending.setdefault(page_id, {}).update(updates)
+            self._first_seen.setdefault(page_id, time.monotonic())
+            self.stats['submitted'] += 1
+        self._ensure_worker()
+        self._wake_event.set()
+
+    def flush(self, page_id: Optional[str] = None):
+        """Envia imediatamente as atualizações pendentes (de uma página ou de todas)"""
+        with self._lock:
+            page_ids = [page_id] if page_id else list(self._pending)
+        for pid in page_ids:
+            self._send_page(pid)
+
+    def close(self):
+        """Para o worker e envia tudo o que estiver pendente"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._worker and self._worker is not threading.current_thread():
+            self._worker.join(self.window + 1)
+        self.flush()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stop_event.clear()
+            self._worker = threading.Thread(target=self._run, name="notion-coalescer", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                now = time.monotonic()
+                due = [pid for pid, seen in self._first_seen.items() if now - seen >= self.window]
+                next_due = min(
+                    (seen + self.window - now for pid, seen in self._first_seen.items() if pid not in due),
+                    default=None
+                )
+
+            for page_id in due:
+                self._send_page(page_id)
+
+            self._wake_event.wait(next_due if next_due is not None else self.window)
+            self._wake_event.clear()
+
+    def _send_page(self, page_id: str):
+        page_lock = self._page_locks[hash(page_id) % self.LOCK_STRIPES]
+
+        with page_lock:
+            with self._lock:
+                updates = self._pending.pop(page_id, None)
+                self._first_seen.pop(page_id, None)
+            if not updates:
+                return
+
+            try:
+                ok = self.send(page_id, updates)
+            except Exception as e:
+                print(f"⚠️ Coalescer: erro ao atualizar {page_id[:8]}...: {e}")
+                ok = False
+
+            with self._lock:
+                if ok:
+                    self.stats['sent'] += 1
+                    self._failures.pop(page_id, None)
+                    return
+
+                self.stats['failed'] += 1
+                failures = self._failures.get(page_id, 0) + 1
+                if failures >= self.max_failures:
+                    # Leva junto o que chegou durante o envio, para a ordem continuar a mesma
+                    self._failures.pop(page_id, None)
+                    self._first_seen.pop(page_id, None)
+                    updates = dict(updates, **self._pending.pop(page_id, {}))
+                    give_up = True
+                else:
+                    give_up = False
+                    # Reenfileira sem sobrescrever atualizações mais novas que chegaram no meio
+                    self._failures[page_id] = failures
+                    merged = dict(updates)
+                    merged.update(self._pending.get(page_id, {}))
+                    self._pending[page_id] = merged
+                    self._first_seen.setdefault(page_id, time.monotonic())
+
+            if give_up:
+                self._hand_off(page_id, updates, failures)
+
+    def _hand_off(self, page_id: str, updates: Dict, failures: int):
+        """Entrega a mescla que esgotou as tentativas ao on_failed (ainda sob o lock da página)"""
+        if self.on_failed:
+            try:
+                self.on_failed(page_id, updates)
+                with self._lock:
+                    self.stats['handed_off'] += 1
+                print(f"📮 Coalescer: atualização de {page_id[:8]}... enviada ao outbox após {failures} falhas")
+                return
+            except Exception as e:
+                print(f"⚠️ Coalescer: falha ao repassar atualização de {page_id[:8]}...: {e}")
+        print(f"❌ Coalescer: atualização de {page_id[:8]}... descartada após {failures} falhas")
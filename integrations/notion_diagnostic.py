@@ -1,20 +1,18 @@
-import requests
 import os
 import json
 from typing import Dict, List, Optional
 
+from integrations.notion_transport import get_transport
+
 class NotionDiagnostic:
     """Ferramenta de diagnóstico para problemas de configuração do Notion"""
     
     def __init__(self, token: str, database_id: str):
         self.token = token
         self.database_id = database_id
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"
-        }
-        self.base_url = "https://api.notion.com/v1"
+        self.transport = get_transport(token)
+        self.headers = self.transport.headers
+        self.base_url = self.transport.base_url
     
     def run_full_diagnostic(self) -> Dict:
         """Executa diagnóstico completo"""
@@ -56,7 +54,7 @@ class NotionDiagnostic:
         
         # Testa conectividade básica
         try:
-            response = requests.get(f"{self.base_url}/users/me", headers=self.headers)
+            response = self.transport.get("users/me")
             if response.status_code == 200:
                 user_data = response.json()
                 return {
@@ -126,7 +124,7 @@ class NotionDiagnostic:
         url = f"{self.base_url}/databases/{self.database_id}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.transport.get(url)
             
             if response.status_code == 200:
                 db_data = response.json()
@@ -173,7 +171,7 @@ class NotionDiagnostic:
         url = f"{self.base_url}/databases/{self.database_id}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.transport.get(url)
             
             if response.status_code != 200:
                 return {
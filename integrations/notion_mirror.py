@@ -0,0 +1,275 @@
+import sqlite3
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+def to_utc_key(value) -> Optional[str]:
+    """Scheduled Time -> 'YYYY-MM-DDTHH:MM:SS' em UTC, comparável como texto.
+
+    Valores sem fuso (e datas sem horário, tratadas como meia-noite) são hora local.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+class NotionMirror:
+    """Espelho local (SQLite) do database de tarefas do Notion com sync incremental"""
+
+    COLUMNS = [
+        'id', 'title', 'category', 'priority', 'status', 'estimated_time', 'actual_time',
+        'created_date', 'due_date', 'scheduled_time', 'description', 'tags', 'last_edited_time'
+    ]
+
+    def __init__(self, notion, db_path: str = "chronos_knowledge.db"):
+        self.notion = notion
+        self.db_path = db_path
+        self.init_mirror_tables()
+        self._sync_lock = threading.Lock()
+        self._sync_thread = None
+        self._stop_event = threading.Event()
+
+    def init_mirror_tables(self):
+        """Inicializa tabelas do espelho"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notion_tasks (
+                id TEXT PRIMARY KEY,
+                database_id TEXT NOT NULL,
+                title TEXT,
+                category TEXT,
+                priority TEXT,
+                status TEXT,
+                estimated_time REAL,
+                actual_time REAL,
+                created_date TEXT,
+                due_date TEXT,
+                scheduled_time TEXT,
+                description TEXT,
+                tags TEXT,
+                last_edited_time TEXT,
+                synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                scheduled_utc TEXT
+            )
+        ''')
+
+        # Espelhos criados antes da coluna normalizada: adiciona e preenche a partir do texto original
+        cursor.execute('PRAGMA table_info(notion_tasks)')
+        if 'scheduled_utc' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE notion_tasks ADD COLUMN scheduled_utc TEXT')
+            cursor.execute('SELECT id, scheduled_time FROM notion_tasks WHERE scheduled_time IS NOT NULL')
+            cursor.executemany('UPDATE notion_tasks SET scheduled_utc = ? WHERE id = ?',
+                               [(to_utc_key(scheduled), task_id) for task_id, scheduled in cursor.fetchall()])
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notion_tasks_scheduled_utc
+            ON notion_tasks (database_id, scheduled_utc)
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notion_tasks_created
+            ON notion_tasks (database_id, created_date)
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notion_sync_state (
+                database_id TEXT PRIMARY KEY,
+                last_edited_checkpoint TEXT,
+                last_sync_at TIMESTAMP
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    # === SINCRONIZAÇÃO ===
+
+    def sync(self, full: bool = False) -> int:
+        """Sincroniza páginas editadas desde o último checkpoint; retorna o total espelhado.
+
+        A query do Notion não devolve páginas arquivadas, então o sync incremental só remove as
+        que ainda chegam marcadas como arquivadas; o sync completo remove do espelho tudo o que
+        não foi lido.
+        """
+        if not self.notion.database_id:
+            return 0
+
+        with self._sync_lock:
+            checkpoint = None if full else self._get_checkpoint()
+
+            query = {"sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+            if checkpoint:
+                # last_edited_time tem granularidade de minuto: on_or_after re-lê a borda,
+                # o upsert é idempotente
+                query["filter"] = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": checkpoint}
+                }
+
+            synced = 0
+            batch = []
+            seen = set()
+            latest = checkpoint
+            # No sync completo uma leitura interrompida não pode apagar as páginas não lidas
+            for task in self.notion.iter_tasks(query=query, strict=full):
+                batch.append(task)
+                seen.add(task.get('id'))
+                if task.get('last_edited_time') and (latest is None or task['last_edited_time'] > latest):
+                    latest = task['last_edited_time']
+                if len(batch) >= 100:
+                    synced += self.upsert_tasks(batch)
+                    batch = []
+            if batch:
+                synced += self.upsert_tasks(batch)
+            removed = self._delete_missing(seen) if full else 0
+
+            # Resultados vêm ordenados por last_edited_time: o que foi lido é um prefixo
+            # consistente, então o checkpoint pode avançar mesmo após uma falha parcial
+            self._save_checkpoint(latest)
+
+        if synced:
+            print(f"🔄 Mirror: {synced} tarefa(s) sincronizada(s) do Notion")
+        if removed:
+            print(f"🔄 Mirror: {removed} tarefa(s) arquivada(s)/excluída(s) removida(s)")
+        return synced
+
+    def start_background_sync(self, interval: float = 60.0, full_interval: float = 3600.0):
+        """Mantém o espelho atualizado em uma thread de background.
+
+        A cada full_interval segundos o sync é completo, para descartar páginas arquivadas
+        ou excluídas no Notion.
+        """
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+
+        def run():
+            last_full = time.monotonic()
+            while not self._stop_event.is_set():
+                full = time.monotonic() - last_full >= full_interval
+                try:
+                    self.sync(full=full)
+                    if full:
+                        last_full = time.monotonic()
+                except Exception as e:
+                    print(f"⚠️ Mirror: falha na sincronização: {type(e).__name__}: {e}")
+                self._stop_event.wait(interval)
+
+        self._stop_event.clear()
+        self._sync_thread = threading.Thread(target=run, name="notion-mirror-sync", daemon=True)
+        self._sync_thread.start()
+        print(f"🔄 Mirror: sincronização em background a cada {interval:.0f}s")
+
+    def stop_background_sync(self):
+        """Interrompe a thread de sincronização"""
+        self._stop_event.set()
+
+    def upsert_tasks(self, tasks: List[Dict]) -> int:
+        """Insere/atualiza tarefas no espelho; tarefas arquivadas são removidas"""
+        archived = [(task['id'],) for task in tasks if task.get('id') and task.get('archived')]
+        rows = [
+            (
+                task['id'], self.notion.database_id, task.get('title'), task.get('category'),
+                task.get('priority'), task.get('status'), task.get('estimated_time'),
+                task.get('actual_time'), task.get('created_date'), task.get('due_date'),
+                task.get('scheduled_time'), task.get('description'),
+                json.dumps(task.get('tags') or []), task.get('last_edited_time'),
+                datetime.now(), to_utc_key(task.get('scheduled_time'))
+            )
+            for task in tasks if task.get('id') and not task.get('archived')
+        ]
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO notion_tasks
+            (id, database_id, title, category, priority, status, estimated_time, actual_time,
+             created_date, due_date, scheduled_time, description, tags, last_edited_time, synced_at,
+             scheduled_utc)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        cursor.executemany('DELETE FROM notion_tasks WHERE id = ?', archived)
+        conn.commit()
+        conn.close()
+
+        return len(rows) + len(archived)
+
+    def _delete_missing(self, seen: set) -> int:
+        """Remove do espelho as tarefas do database que não vieram num sync completo"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM notion_tasks WHERE database_id = ?', (self.notion.database_id,))
+        missing = [(row[0],) for row in cursor.fetchall() if row[0] not in seen]
+        cursor.executemany('DELETE FROM notion_tasks WHERE id = ?', missing)
+        conn.commit()
+        conn.close()
+        return len(missing)
+
+    def _get_checkpoint(self) -> Optional[str]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT last_edited_checkpoint FROM notion_sync_state WHERE database_id = ?',
+                       (self.notion.database_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def _save_checkpoint(self, checkpoint: Optional[str]):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO notion_sync_state (database_id, last_edited_checkpoint, last_sync_at)
+            VALUES (?, ?, ?)
+        ''', (self.notion.database_id, checkpoint, datetime.now()))
+        conn.commit()
+        conn.close()
+
+    # === LEITURAS ===
+
+    def get_today_tasks(self) -> List[Dict]:
+        """Tarefas agendadas para hoje, lidas do espelho"""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.get_tasks_between(today, today + timedelta(days=1))
+
+    def get_tasks_between(self, start: datetime, end: datetime) -> List[Dict]:
+        """Tarefas com Scheduled Time em [start, end); limites sem fuso são hora local"""
+        # Comparação em UTC: horários com offset ("...-03:00"), "Z" e sem fuso ficam na mesma escala
+        return self._select('''
+            WHERE database_id = ? AND scheduled_utc >= ? AND scheduled_utc < ?
+            ORDER BY scheduled_utc
+        ''', (self.notion.database_id, to_utc_key(start), to_utc_key(end)))
+
+    def get_task_history(self, days_back: int = 30) -> List[Dict]:
+        """Histórico de tarefas criadas nos últimos N dias"""
+        # Created vem do Notion em UTC ("...Z"), que compara como texto com a chave UTC
+        since = to_utc_key(datetime.now() - timedelta(days=days_back))
+        return self._select('''
+            WHERE database_id = ? AND created_date >= ?
+            ORDER BY created_date DESC
+        ''', (self.notion.database_id, since))
+
+    def _select(self, where: str, params: tuple) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(self.COLUMNS)} FROM notion_tasks {where}", params)
+
+        tasks = []
+        for row in cursor.fetchall():
+            task = dict(zip(self.COLUMNS, row))
+            try:
+                task['tags'] = json.loads(task['tags']) if task['tags'] else []
+            except ValueError:
+                task['tags'] = []
+            tasks.append(task)
+
+        conn.close()
+        return tasks
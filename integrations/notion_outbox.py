@@ -0,0 +1,395 @@
+import sqlite3
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+class NotionOutbox:
+    """Outbox durável (SQLite) para escritas no Notion, drenada por um worker em background"""
+
+    def __init__(self, notion, db_path: str = "chronos_knowledge.db",
+                 batch_size: int = 20, max_attempts: int = 8,
+                 on_created: Optional[Callable[[str, str, Dict, Dict], None]] = None):
+        self.notion = notion
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.on_created = on_created
+        self.init_outbox_table()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._worker = None
+
+    def init_outbox_table(self):
+        """Inicializa tabela do outbox"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notion_outbox (
+                id INTEGER PRIMARY KEY,
+                operation TEXT NOT NULL,
+                task_ref TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                notion_page_id TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP,
+                ambiguous INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Outboxes anteriores à marcação de criações ambíguas
+        cursor.execute('PRAGMA table_info(notion_outbox)')
+        if 'ambiguous' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE notion_outbox ADD COLUMN ambiguous INTEGER NOT NULL DEFAULT 0')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notion_outbox_pending
+            ON notion_outbox (status, operation, id)
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notion_outbox_task_ref
+            ON notion_outbox (task_ref)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    # === ENFILEIRAMENTO ===
+
+    def enqueue_create(self, task_ref: str, task_data: Dict, schedule_info: Dict) -> int:
+        """Enfileira a criação de uma tarefa; task_ref é o ID local usado para consultar o status"""
+        return self._enqueue('create', task_ref, {'task_data': task_data, 'schedule_info': schedule_info})
+
+    def enqueue_creates(self, items: List[Tuple[str, Dict, Dict]]) -> List[int]:
+        """Enfileira várias criações (task_ref, task_data, schedule_info) numa única transação"""
+        return self._enqueue_many('create', [
+            (task_ref, {'task_data': task_data, 'schedule_info': schedule_info})
+            for task_ref, task_data, schedule_info in items
+        ])
+
+    def enqueue_update(self, task_ref: str, updates: Dict) -> int:
+        """Enfileira uma atualização; task_ref pode ser o ID local ou o page id do Notion"""
+        return self._enqueue('update', task_ref, {'updates': updates})
+
+    def _enqueue(self, operation: str, task_ref: str, payload: Dict) -> int:
+        return self._enqueue_many(operation, [(task_ref, payload)])[0]
+
+    def _enqueue_many(self, operation: str, entries: List[Tuple[str, Dict]]) -> List[int]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        now = datetime.now()
+        row_ids = []
+        for task_ref, payload in entries:
+            cursor.execute('''
+                INSERT INTO notion_outbox (operation, task_ref, payload, updated_at)
+                VALUES (?, ?, ?, ?)
+            ''', (operation, task_ref, json.dumps(payload), now))
+            row_ids.append(cursor.lastrowid)
+        conn.commit()
+        conn.close()
+
+        self._wake_event.set()
+        return row_ids
+
+    # === CONSULTAS ===
+
+    def get_status(self, task_ref: str) -> Optional[Dict]:
+        """Status da criação de uma tarefa enfileirada"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT status, notion_page_id, attempts, last_error, created_at, updated_at
+            FROM notion_outbox
+            WHERE task_ref = ? AND operation = 'create'
+            ORDER BY id DESC LIMIT 1
+        ''', (task_ref,))
+        row = cursor.fetchone()
+
+        pending_updates = 0
+        if row:
+            cursor.execute('''
+                SELECT COUNT(*) FROM notion_outbox
+                WHERE operation = 'update' AND status = 'pending' AND task_ref IN (?, ?)
+            ''', (task_ref, row[1] or task_ref))
+            pending_updates = cursor.fetchone()[0]
+        conn.close()
+
+        if not row:
+            return None
+
+        return {
+            'task_ref': task_ref,
+            'status': row[0],
+            'notion_page_id': row[1],
+            'attempts': row[2],
+            'last_error': row[3],
+            'queued_at': row[4],
+            'updated_at': row[5],
+            'pending_updates': pending_updates
+        }
+
+    def pending_creates(self) -> List[Dict]:
+        """Criações ainda não enviadas, como tarefas (scheduled_time, estimated_time) para a agenda"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT task_ref, payload FROM notion_outbox
+            WHERE operation = 'create' AND status = 'pending'
+            ORDER BY id
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+
+        tasks = []
+        for task_ref, payload in rows:
+            data = json.loads(payload)
+            task_data, schedule_info = data['task_data'], data['schedule_info']
+            tasks.append({
+                'id': task_ref,
+                'title': task_data.get('title'),
+                'scheduled_time': schedule_info.get('scheduled_datetime'),
+                'estimated_time': schedule_info.get('duration_minutes') or task_data.get('estimated_time')
+            })
+        return tasks
+
+    def has_pending_updates(self, task_ref: str) -> bool:
+        """True se há atualizações ainda não enviadas para o task_ref"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT 1 FROM notion_outbox
+            WHERE operation = 'update' AND status = 'pending' AND task_ref = ?
+            LIMIT 1
+        ''', (task_ref,))
+        row = cursor.fetchone()
+        conn.close()
+        return row is not None
+
+    def pending_count(self) -> int:
+        """Total de operações ainda não enviadas"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM notion_outbox WHERE status = 'pending'")
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+
+    # === WORKER ===
+
+    def start(self, poll_interval: float = 5.0):
+        """Inicia o worker que drena o outbox"""
+        if self._worker and self._worker.is_alive():
+            return
+
+        def run():
+            while not self._stop_event.is_set():
+                try:
+                    processed = self.drain_once()
+                except Exception as e:
+                    print(f"⚠️ Outbox: falha ao drenar: {type(e).__name__}: {e}")
+                    processed = 0
+                if not processed:
+                    self._wake_event.wait(poll_interval)
+                    self._wake_event.clear()
+
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=run, name="notion-outbox", daemon=True)
+        self._worker.start()
+        print(f"📮 Outbox: worker iniciado ({self.pending_count()} operação(ões) pendente(s))")
+
+    def stop(self, timeout: float = 10.0):
+        """Para o worker, tentando enviar o que ainda estiver pendente dentro do timeout"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._worker:
+            self._worker.join(timeout)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.drain_once():
+            pass
+
+    def drain_once(self) -> int:
+        """Envia um lote de criações e as atualizações prontas; retorna quantas operações concluiu"""
+        # Com o circuito do Notion aberto, tentar só queimaria tentativas das operações
+        if self.notion.transport.breaker.is_open():
+            return 0
+        with self._drain_lock:
+            return self._drain_creates() + self._drain_updates()
+
+    def _drain_creates(self) -> int:
+        """Envia um lote de criações.
+
+        POST /pages não é idempotente: uma criação que falhou de forma ambígua (timeout ou 5xx
+        após o envio) só é reenviada depois de procurar a página pela referência (REF_PROPERTY).
+        Se a requisição não levava a referência, ela não é reenviada, para não duplicar a página.
+        """
+        rows = self._fetch_pending('create', self.batch_size)
+        if not rows:
+            return 0
+
+        done = 0
+        batch = []
+        for row_id, task_ref, payload, attempts, _, ambiguous in rows:
+            data = json.loads(payload)
+            # A referência gravada na página é o task_ref do outbox
+            schedule_info = dict(data['schedule_info'], task_id=task_ref)
+            if ambiguous:
+                try:
+                    page_id = self.notion.find_page_by_ref(task_ref)
+                except Exception as e:
+                    self._mark_failed_attempt(row_id, attempts, f"verificação da criação falhou: {e}")
+                    continue
+                if page_id:
+                    print(f"📮 Outbox: {task_ref} já existia no Notion - criação não reenviada")
+                    self._complete_create(row_id, task_ref, page_id, data['task_data'], schedule_info)
+                    done += 1
+                    continue
+            batch.append((row_id, task_ref, attempts, data['task_data'], schedule_info))
+
+        results = self.notion.create_tasks([(task_data, schedule_info) for *_, task_data, schedule_info in batch])
+
+        for (row_id, task_ref, attempts, task_data, schedule_info), result in zip(batch, results):
+            if result['success']:
+                self._complete_create(row_id, task_ref, result['task_id'], task_data, schedule_info)
+                done += 1
+            elif result.get('ambiguous'):
+                if result.get('verifiable'):
+                    self._mark_failed_attempt(row_id, attempts, result.get('error'), ambiguous=True)
+                else:
+                    print(f"❌ Outbox: criação {task_ref} ambígua - não reenviada para evitar página duplicada")
+                    self._mark_abandoned(row_id, f"criação ambígua, não reenviada: {result.get('error')}"[:500])
+            else:
+                self._mark_failed_attempt(row_id, attempts, result.get('error'))
+        return done
+
+    def _complete_create(self, row_id: int, task_ref: str, page_id: str, task_data: Dict, schedule_info: Dict):
+        self._mark_done(row_id, page_id)
+        if self.on_created:
+            try:
+                self.on_created(task_ref, page_id, task_data, schedule_info)
+            except Exception as e:
+                print(f"⚠️ Outbox: callback on_created falhou: {e}")
+
+    def _drain_updates(self) -> int:
+        rows = self._fetch_pending('update', limit=None, due_only=False)
+        if not rows:
+            return 0
+
+        # Agrupa por task_ref o prefixo de atualizações prontas, preservando a ordem:
+        # uma atualização em espera (backoff) bloqueia as seguintes da mesma página
+        ready: Dict[str, List[tuple]] = {}
+        blocked_refs = set()
+        now = time.time()
+        for row in rows:
+            task_ref, next_attempt_at = row[1], row[4]
+            if task_ref in blocked_refs:
+                continue
+            if next_attempt_at > now:
+                blocked_refs.add(task_ref)
+                continue
+            ready.setdefault(task_ref, []).append(row)
+
+        done = 0
+        for task_ref, page_rows in ready.items():
+            page_id, create_status = self._resolve_page_id(task_ref)
+            if create_status == 'pending':
+                continue
+            if create_status == 'failed':
+                for row in page_rows:
+                    self._mark_abandoned(row[0], "criação da tarefa falhou")
+                continue
+
+            # Mescla as atualizações da página em um único PATCH (última escrita vence)
+            merged = {}
+            for row in page_rows:
+                merged.update(json.loads(row[2])['updates'])
+
+            if self.notion.update_task(page_id, merged):
+                for row in page_rows:
+                    self._mark_done(row[0], page_id)
+                done += len(page_rows)
+            else:
+                for row in page_rows:
+                    self._mark_failed_attempt(row[0], row[3], "update_task retornou falha")
+        return done
+
+    def _resolve_page_id(self, task_ref: str) -> tuple:
+        """Resolve o page id do Notion para um task_ref (page id, status da criação)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT notion_page_id, status FROM notion_outbox
+            WHERE task_ref = ? AND operation = 'create'
+            ORDER BY id DESC LIMIT 1
+        ''', (task_ref,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return task_ref, 'done'  # Já é um page id do Notion
+        return row[0], row[1]
+
+    def _fetch_pending(self, operation: str, limit: Optional[int], due_only: bool = True) -> List[tuple]:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        query = '''
+            SELECT id, task_ref, payload, attempts, next_attempt_at, ambiguous FROM notion_outbox
+            WHERE status = 'pending' AND operation = ? AND next_attempt_at <= ?
+            ORDER BY id
+        '''
+        params = (operation, time.time() if due_only else float('inf'))
+        if limit is not None:
+            query += ' LIMIT ?'
+            params += (limit,)
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def _mark_done(self, row_id: int, notion_page_id: Optional[str]):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE notion_outbox
+            SET status = 'done', notion_page_id = ?, attempts = attempts + 1, last_error = NULL, updated_at = ?
+            WHERE id = ?
+        ''', (notion_page_id, datetime.now(), row_id))
+        conn.commit()
+        conn.close()
+
+    def _mark_failed_attempt(self, row_id: int, attempts: int, error: Optional[str], ambiguous: bool = False):
+        attempts += 1
+        status = 'failed' if attempts >= self.max_attempts else 'pending'
+        next_attempt_at = time.time() + min(2 ** attempts, 300)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE notion_outbox
+            SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ?,
+                ambiguous = MAX(ambiguous, ?)
+            WHERE id = ?
+        ''', (status, attempts, (error or '')[:500], next_attempt_at, datetime.now(), int(ambiguous), row_id))
+        conn.commit()
+        conn.close()
+
+        if status == 'failed':
+            print(f"❌ Outbox: operação {row_id} descartada após {attempts} tentativas: {error}")
+
+    def _mark_abandoned(self, row_id: int, reason: str):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE notion_outbox SET status = 'failed', last_error = ?, updated_at = ?
+            WHERE id = ?
+        ''', (reason, datetime.now(), row_id))
+        conn.commit()
+        conn.close()
@@ -0,0 +1,225 @@
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from integrations.circuit_breaker import get_breaker
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+
+_ID_SEGMENT = re.compile(r'^[0-9a-fA-F-]{32,36}$')
+
+
+class TokenBucket:
+    """Limitador de taxa token-bucket (thread-safe)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Bloqueia até haver um token disponível; retorna o tempo de espera em segundos"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+
+                delay = (1 - self.tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Esvazia o bucket por alguns segundos (usado após um 429).
+
+        429s simultâneos não se acumulam: a pausa é a do maior Retry-After recebido.
+        """
+        with self.lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+            self.updated_at = time.monotonic()
+
+
+class NotionTransport:
+    """Transporte HTTP compartilhado da Notion API: pool keep-alive, rate limit e retries"""
+
+    # 429 e 503 não são processados pelo Notion, então são seguros para qualquer método
+    ALWAYS_RETRY_STATUS = {429, 503}
+    IDEMPOTENT_RETRY_STATUS = {500, 502, 504}
+
+    def __init__(self, token: str, base_url: Optional[str] = None,
+                 rate_per_sec: Optional[float] = None, max_retries: Optional[int] = None,
+                 timeout: Optional[float] = None, pool_size: int = 10):
+        self.token = token
+        self.base_url = (base_url or os.getenv('NOTION_BASE_URL', NOTION_API_URL)).rstrip('/')
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION
+        }
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('NOTION_MAX_RETRIES', '3'))
+        self.timeout = timeout if timeout is not None else float(os.getenv('NOTION_TIMEOUT', '30'))
+
+        rate = rate_per_sec if rate_per_sec is not None else float(os.getenv('NOTION_RATE_LIMIT', '3'))
+        self.limiter = TokenBucket(rate=rate, capacity=max(rate, 1.0))
+
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.breaker = get_breaker('notion')
+
+        self._stats: Dict[str, Dict] = {}
+        self._stats_lock = threading.Lock()
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+
+    def request(self, method: str, path: str, json: Optional[Dict] = None,
+                timeout: Optional[float] = None, idempotent: Optional[bool] = None) -> requests.Response:
+        """Executa uma requisição com rate limit e retries guiados por Retry-After.
+
+        Retorna a última resposta recebida (mesmo se ainda for 429/5xx após os retries);
+        exceções de conexão/timeout são propagadas após esgotar as tentativas. Com o circuito
+        aberto levanta CircuitOpenError sem fazer a requisição.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        endpoint = self._endpoint_key(method, url)
+        if idempotent is None:
+            idempotent = method in ("GET", "PATCH") or url.endswith("/query")
+
+        self.breaker.before_call()
+
+        try:
+            attempt = 0
+            while True:
+                waited = self.limiter.acquire()
+                start = time.perf_counter()
+                try:
+                    response = self.session.request(method, url, json=json, timeout=timeout or self.timeout)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    self._record(endpoint, time.perf_counter() - start, waited, error=True)
+                    if not idempotent or attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    self._record_retry(endpoint)
+                    time.sleep(self._backoff(attempt))
+                    continue
+
+                elapsed = time.perf_counter() - start
+                retryable = response.status_code in self.ALWAYS_RETRY_STATUS or \
+                    (idempotent and response.status_code in self.IDEMPOTENT_RETRY_STATUS)
+                self._record(endpoint, elapsed, waited, error=response.status_code >= 400)
+
+                if not retryable or attempt >= self.max_retries:
+                    # 429 é limite de uso, não indisponibilidade: só 5xx conta como falha do backend
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return response
+
+                attempt += 1
+                delay = self._retry_after(response) or self._backoff(attempt)
+                if response.status_code == 429:
+                    print(f"🚦 Notion: rate limit atingido - aguardando {delay:.1f}s (tentativa {attempt}/{self.max_retries})")
+                    self.limiter.pause(delay)
+                self._record_retry(endpoint)
+                time.sleep(delay)
+        except BaseException:
+            # Toda saída sem resposta conta como falha: sem um resultado registrado a sonda
+            # do meio-aberto ficaria consumida e o circuito recusaria chamadas para sempre
+            self.breaker.record_failure()
+            raise
+
+    def stats(self) -> Dict:
+        """Contadores de latência por endpoint"""
+        with self._stats_lock:
+            return {
+                endpoint: {
+                    **data,
+                    'avg_ms': data['total_ms'] / data['calls'] if data['calls'] else 0.0
+                } for endpoint, data in self._stats.items()
+            }
+
+    def _record(self, endpoint: str, elapsed: float, waited: float, error: bool):
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            data = self._stats.setdefault(endpoint, {
+                'calls': 0, 'errors': 0, 'retries': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0, 'throttled_ms': 0.0
+            })
+            data['calls'] += 1
+            data['errors'] += 1 if error else 0
+            data['total_ms'] += elapsed_ms
+            data['max_ms'] = max(data['max_ms'], elapsed_ms)
+            data['last_ms'] = elapsed_ms
+            data['throttled_ms'] += waited * 1000
+
+    def _record_retry(self, endpoint: str):
+        with self._stats_lock:
+            if endpoint in self._stats:
+                self._stats[endpoint]['retries'] += 1
+
+    def _endpoint_key(self, method: str, url: str) -> str:
+        """Normaliza a URL em uma chave estável (IDs viram {id})"""
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        segments = [
+            "{id}" if _ID_SEGMENT.match(segment) else segment
+            for segment in path.split("?")[0].strip("/").split("/")
+        ]
+        return f"{method} /{'/'.join(segments)}"
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(0.5 * (2 ** (attempt - 1)), 8.0)
+
+
+_transports: Dict[tuple, NotionTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(token: str, base_url: Optional[str] = None) -> NotionTransport:
+    """Retorna o transporte compartilhado do processo para este token"""
+    key = (token, base_url or os.getenv('NOTION_BASE_URL', NOTION_API_URL))
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = NotionTransport(token, base_url=key[1])
+        return _transports[key]
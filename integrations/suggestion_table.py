@@ -0,0 +1,141 @@
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from integrations.ai_cache import duration_bucket
+
+# Grade exibida no dashboard
+CATEGORIES = ['Development', 'Meetings', 'Research', 'Documentation', 'Planning', 'Review']
+PRIORITIES = ['Baixa', 'Média', 'Alta', 'Urgente']
+
+# Janela preferida por categoria (início, fim)
+CATEGORY_TIMING = {
+    'Development': (9, 11),     # Manhã
+    'Meetings': (14, 16),       # Tarde
+    'Research': (10, 12),       # Manhã
+    'Documentation': (15, 17),  # Tarde
+    'Planning': (8, 10),        # Início do dia
+    'Review': (16, 18),         # Final do dia
+}
+DEFAULT_TIMING = (10, 14)
+
+def preferred_window(category: str, priority: str) -> Tuple[int, int]:
+    """Janela da categoria ajustada pela prioridade"""
+    start_hour, end_hour = CATEGORY_TIMING.get(category, DEFAULT_TIMING)
+    if priority == 'Urgente':
+        start_hour = max(9, start_hour - 2)
+    elif priority == 'Baixa':
+        start_hour = min(16, start_hour + 3)
+    return start_hour, end_hour
+
+def fallback_rule(category: str, priority: str) -> Tuple[float, str]:
+    """Deslocamento em horas e justificativa do fallback do ChronosCore"""
+    return FALLBACK_RULES.get((category, priority)) or _fallback_rule(category, priority)
+
+def _fallback_rule(category: str, priority: str) -> Tuple[float, str]:
+    if category == 'Development':
+        return 1, "Development funciona melhor pela manhã"
+    if category == 'Meetings':
+        return 3, "Meetings são ideais no meio do dia"
+    if priority == 'Urgente':
+        return 0.5, "prioridade urgente requer ação imediata"
+    return 1, "baseado em horário padrão"
+
+FALLBACK_RULES = {(c, p): _fallback_rule(c, p) for c in CATEGORIES for p in PRIORITIES}
+
+class SuggestionTable:
+    """Sugestões heurísticas pré-calculadas para a grade categoria x prioridade.
+
+    As células são montadas uma vez por hora (ou quando a versão dos padrões muda):
+    fora da janela preferida o horário é fixo e a resposta já sai pronta; dentro dela
+    (agora + 1h) só o horário é calculado na consulta. Também conta as consultas por
+    célula e faixa de duração, para o refresh especulativo do LLM.
+
+    Só a grade CATEGORIES x PRIORITIES é guardada e contada: categoria/prioridade livres
+    vindas da requisição são calculadas na hora, sem crescer a tabela nem o contador.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._built_for: Optional[Tuple] = None
+        self._cells: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self.frequency: Counter = Counter()
+        self.stats = {'lookups': 0, 'rebuilds': 0}
+
+    def lookup(self, task_data: Dict, now: Optional[datetime] = None) -> Dict:
+        """Sugestão heurística da tarefa (equivalente à antiga _generate_dev_suggestion)"""
+        now = now or datetime.now()
+        category = task_data.get('category', 'Development')
+        priority = task_data.get('priority', 'Média')
+        estimated_time = task_data.get('estimated_time', 60)
+
+        with self._lock:
+            if self._built_for != (now.date(), now.hour, self.version):
+                self._rebuild(now)
+            cell = self._cells.get((category, priority))
+            if cell is not None:
+                self.frequency[(category, priority, duration_bucket(estimated_time))] += 1
+            self.stats['lookups'] += 1
+
+        if cell is None:
+            cell = self._build_cell(category, priority, now)
+
+        if cell['fixed']:
+            suggestion = dict(cell['fixed'])
+        else:
+            scheduled = now + timedelta(hours=1)
+            suggestion = {
+                "scheduled_datetime": scheduled.isoformat(),
+                "reasoning": f"{cell['reasoning']}. Agendado para {scheduled.strftime('%H:%M')}",
+                "alternatives": [
+                    f"Alternativa 1: {(scheduled + timedelta(hours=1)).strftime('%H:%M')}",
+                    f"Alternativa 2: {(scheduled + timedelta(hours=2)).strftime('%H:%M')}"
+                ]
+            }
+        suggestion['alternatives'] = list(suggestion['alternatives'])
+        suggestion['confidence_score'] = random.uniform(0.75, 0.95)
+        suggestion['duration_minutes'] = estimated_time
+        return suggestion
+
+    def invalidate(self):
+        """Padrões do usuário mudaram: a grade é remontada na próxima consulta"""
+        with self._lock:
+            self.version += 1
+
+    def hottest(self, limit: int) -> List[Tuple[str, str, int]]:
+        """Células (categoria, prioridade, faixa de duração) mais consultadas"""
+        with self._lock:
+            return [cell for cell, _ in self.frequency.most_common(limit)]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, cells=len(self._cells), version=self.version,
+                        hottest=[list(cell) for cell, _ in self.frequency.most_common(5)])
+
+    def _rebuild(self, now: datetime):
+        self._cells = {(c, p): self._build_cell(c, p, now) for c in CATEGORIES for p in PRIORITIES}
+        self._built_for = (now.date(), now.hour, self.version)
+        self.stats['rebuilds'] += 1
+
+    @staticmethod
+    def _build_cell(category: str, priority: str, now: datetime) -> Dict:
+        start_hour, end_hour = preferred_window(category, priority)
+        reasoning = (f"GPT-Dev: {category} funciona melhor entre {start_hour}h-{end_hour}h. "
+                     f"Prioridade {priority} sugere este horário")
+
+        if now.hour < start_hour:
+            scheduled = now.replace(hour=start_hour, minute=0, second=0, microsecond=0)
+        elif now.hour > end_hour:
+            scheduled = now.replace(hour=start_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        else:
+            return {'fixed': None, 'reasoning': reasoning}
+        return {'fixed': {
+            "scheduled_datetime": scheduled.isoformat(),
+            "reasoning": f"{reasoning}. Agendado para {scheduled.strftime('%H:%M')}",
+            "alternatives": (
+                f"Alternativa 1: {(scheduled + timedelta(hours=1)).strftime('%H:%M')}",
+                f"Alternativa 2: {(scheduled + timedelta(hours=2)).strftime('%H:%M')}"
+            )
+        }}
@@ -1,13 +1,15 @@
 import sqlite3
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 class PatternAnalyzer:
     """Analisa e mantém padrões de comportamento do usuário"""
     
-    def __init__(self, db_path: str = "chronos_knowledge.db"):
+    def __init__(self, db_path: str = "chronos_knowledge.db",
+                 history_source: Optional[Callable[[int], List[Dict]]] = None):
         self.db_path = db_path
+        self.history_source = history_source  # ex.: NotionMirror.get_task_history (leitura local)
         self.init_database()
         self.patterns = {}
         self.confidence_threshold = 0.6
@@ -59,6 +61,27 @@ class PatternAnalyzer:
         
         return patterns
     
+    def refresh_patterns(self, days_back: int = 30) -> Dict:
+        """Reanalisa os padrões com o histórico da fonte local (sem chamadas ao Notion)"""
+        history = self.get_task_history(days_back)
+        if not history:
+            return {}
+        return self.analyze_productivity_patterns(history)
+    
+    def get_task_history(self, days_back: int = 30) -> List[Dict]:
+        """Histórico de tarefas da fonte configurada, no formato esperado pelas análises"""
+        if not self.history_source:
+            return []
+        
+        history = []
+        for task in self.history_source(days_back):
+            task = dict(task)
+            # O espelho não guarda a conclusão: tarefas concluídas usam o horário agendado
+            if not task.get('completed_date') and task.get('status') == 'Concluído':
+                task['completed_date'] = task.get('scheduled_time')
+            history.append(task)
+        return history
+    
     def _analyze_hourly_patterns(self, tasks: List[Dict]) -> Dict:
         """Analisa produtividade por hora do dia"""
         hourly_stats = {}
@@ -408,7 +431,19 @@ class PatternAnalyzer:
                 } for category in categories
             }
         
-        # Implementa lógica para calcular performance das últimas tarefas
+        history = self.get_task_history(days_back=7)
+        measured = [task for task in history if task.get('estimated_time') and task.get('actual_time')]
+        if history:
+            return {
+                'last_7_days_efficiency': (
+                    sum(task['estimated_time'] / max(task['actual_time'], 1) for task in measured) / len(measured)
+                    if measured else None
+                ),
+                'completion_rate': sum(1 for task in history if task.get('status') == 'Concluído') / len(history),
+                'sample_size': len(history)
+            }
+        
+        # Sem histórico local: valores de referência
         return {
             'last_7_days_efficiency': 0.85,
             'completion_rate': 0.90,
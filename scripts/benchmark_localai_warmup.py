@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark de warm-up do LocalAI
+Mede a primeira chamada (fria) contra chamadas aquecidas, com prefixo de sistema fixo
+e com prefixo variável (sem reaproveitamento do prompt cache)
+
+Para medir a partida a frio de verdade, rode logo após: docker-compose restart localai
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Adiciona o diretório do projeto ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cada chamada deve ir ao modelo: sem cache, lote ou warm-up automático
+os.environ['AI_DEV_MODE'] = 'false'
+os.environ['AI_CACHE'] = 'false'
+os.environ['AI_BATCH'] = 'false'
+os.environ['AI_WARMUP'] = 'false'
+
+from integrations.ai_client import AIClient
+from integrations.ai_output import SYSTEM_PREFIX
+
+TASK = {'title': 'Revisar PR do módulo de agenda', 'category': 'Review', 'priority': 'Alta', 'estimated_time': 45}
+
+def timed_call(ai: AIClient, system: str) -> float:
+    prompt = ai._build_scheduling_prompt(TASK, {}, {})
+    start = time.perf_counter()
+    ai._call_openai_local(prompt, output='scheduling', system=system)
+    return (time.perf_counter() - start) * 1000
+
+def summarize(label: str, timings: list):
+    ordered = sorted(timings)
+    p50 = ordered[len(ordered) // 2]
+    print(f"   {label:<28} p50={p50:8.1f} ms  min={ordered[0]:8.1f} ms  máx={ordered[-1]:8.1f} ms")
+
+def run_benchmark(requests_count: int):
+    ai = AIClient()
+
+    print(f"📊 LocalAI em {ai.openai_base_url}: {requests_count} chamada(s) por cenário")
+    print("=" * 70)
+
+    cold = timed_call(ai, SYSTEM_PREFIX)
+    print(f"   {'primeira chamada (fria)':<28} {cold:8.1f} ms")
+
+    fixed = [timed_call(ai, SYSTEM_PREFIX) for _ in range(requests_count)]
+    summarize("prefixo fixo (aquecido)", fixed)
+
+    # Um nonce no início invalida qualquer reaproveitamento de prefixo no servidor
+    varying = [timed_call(ai, f"[{uuid.uuid4().hex}]\n{SYSTEM_PREFIX}") for _ in range(requests_count)]
+    summarize("prefixo variável", varying)
+
+    stats = ai.get_latency_stats()
+    print(f"\n   TTFT médio: {stats['ttft']['avg_ms']} ms | TTLT médio: {stats['ttlt']['avg_ms']} ms "
+          f"| falhas: {stats['failures']}")
+    if fixed:
+        print(f"\n🔥 Fria vs aquecida: {cold / sorted(fixed)[len(fixed) // 2]:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de warm-up do LocalAI")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.requests)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga do NotionClient contra o servidor fake (scripts/fake_notion_server.py)
+Mede leitura paginada, consulta do dia, criação serial vs em lote e atualizações
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Adiciona o diretório do projeto ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.fake_notion_server import FakeNotionServer, SCHEMA_VARIANTS
+
+def timed(label: str, fn, count: int = 1):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    per_op = f"  ({elapsed / count * 1000:7.1f} ms/op)" if count > 1 else ""
+    print(f"   {label:<34} {elapsed * 1000:9.1f} ms{per_op}")
+    return result
+
+def sample_task(index: int) -> tuple:
+    task_data = {
+        'title': f"Tarefa de carga {index}",
+        'category': 'Development',
+        'priority': 'Alta',
+        'estimated_time': 60,
+        'description': 'Criada pelo benchmark',
+        'tags': ['benchmark']
+    }
+    schedule_info = {
+        'scheduled_datetime': (datetime.now() + timedelta(hours=index % 8)).isoformat(),
+        'confidence': 0.8
+    }
+    return task_data, schedule_info
+
+def run_benchmark(args):
+    server = FakeNotionServer(latency=args.latency, error_429=args.error_429, error_5xx=args.error_5xx,
+                              retry_after=args.retry_after, schema_variant=args.schema,
+                              seed_pages=args.seed_pages).start()
+
+    # O transporte lê a configuração do ambiente na criação
+    os.environ['NOTION_BASE_URL'] = server.base_url
+    os.environ['NOTION_RATE_LIMIT'] = str(args.rate_limit)
+
+    from integrations.notion_client import NotionClient
+    notion = NotionClient("fake-token", server.database_id)
+
+    print(f"📊 NotionClient x Fake Notion ({args.schema}, {args.seed_pages} páginas)")
+    print(f"   Latência: {args.latency} | 429: {args.error_429:.0%} | 5xx: {args.error_5xx:.0%} | "
+          f"Rate limit: {args.rate_limit}/s")
+    print("=" * 70)
+
+    try:
+        tasks = timed("get_tasks(30 dias, paginado)", lambda: notion.get_tasks(30))
+        print(f"      → {len(tasks)} tarefas")
+        timed("get_tasks_for_day (frio)", lambda: notion.get_tasks_for_day(date.today()))
+        timed("get_tasks_for_day (cache)", lambda: notion.get_tasks_for_day(date.today()))
+
+        batch = [sample_task(i) for i in range(args.creates)]
+        timed(f"create_task serial x{args.creates}",
+              lambda: [notion.create_task(*item) for item in batch], args.creates)
+        results = timed(f"create_tasks em lote x{args.creates}", lambda: notion.create_tasks(batch), args.creates)
+        created = [r['task_id'] for r in results if r['success']]
+        print(f"      → {len(created)}/{len(batch)} criadas")
+
+        timed(f"update_task x{len(created)}",
+              lambda: [notion.update_task(task_id, {'status': 'Concluído'}) for task_id in created],
+              max(len(created), 1))
+    finally:
+        notion.close()
+        server.stop()
+
+    print("\n📡 Estatísticas do transporte")
+    print("=" * 70)
+    for endpoint, stats in sorted(notion.transport.stats().items()):
+        print(f"   {endpoint:<34} chamadas={stats['calls']:<5} erros={stats['errors']:<3} "
+              f"retries={stats['retries']:<3} média={stats['avg_ms']:7.1f} ms  máx={stats['max_ms']:7.1f} ms")
+    print(f"\n   Requisições no servidor: {server.state.requests} "
+          f"(erros injetados: {server.state.injected_errors})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de carga do NotionClient")
+    parser.add_argument("--latency", default="lognormal:80,0.5")
+    parser.add_argument("--error-429", type=float, default=0.02)
+    parser.add_argument("--error-5xx", type=float, default=0.01)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--schema", choices=sorted(SCHEMA_VARIANTS), default="full")
+    parser.add_argument("--seed-pages", type=int, default=500)
+    parser.add_argument("--creates", type=int, default=30)
+    parser.add_argument("--rate-limit", type=float, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args)
@@ -8,7 +8,7 @@ import os
 import sys
 
 # Adiciona o diretório do projeto ao path
-sys.path.append('/home/william/development-python/chronos-ai')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Tenta importar com fallback
 try:
@@ -23,6 +23,8 @@ except ImportError:
     print("❌ requests não instalado. Execute: pip install requests")
     sys.exit(1)
 
+from integrations.notion_transport import get_transport
+
 def check_database_properties():
     """Verifica se todas as propriedades necessárias estão configuradas"""
     
@@ -33,17 +35,13 @@ def check_database_properties():
         print("❌ NOTION_TOKEN ou DATABASE_ID não configurados")
         return False
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json", 
-        "Notion-Version": "2022-06-28"
-    }
+    transport = get_transport(token)
     
     print("🔍 Verificando propriedades do database...")
     print("=" * 50)
     
     try:
-        response = requests.get(f"https://api.notion.com/v1/databases/{database_id}", headers=headers)
+        response = transport.get(f"databases/{database_id}")
         
         if response.status_code != 200:
             print(f"❌ Erro ao acessar database: {response.status_code}")
@@ -70,7 +68,8 @@ def check_database_properties():
             "Due Date": "date",
             "Scheduled Time": "date", 
             "Description": "rich_text",
-            "Tags": "multi_select"
+            "Tags": "multi_select",
+            "Chronos Ref": "rich_text"
         }
         
         # Adicionar a propriedade title com seu nome real
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Servidor fake da Notion API para benchmarks e testes de carga offline
+Dados em memória, latência configurável, injeção de 429/5xx e variantes de schema
+
+Uso:
+    python scripts/fake_notion_server.py --port 8765 --latency lognormal:80,0.5 --error-429 0.05
+    NOTION_BASE_URL=http://localhost:8765/v1 NOTION_TOKEN=fake DATABASE_ID=<id impresso> make up
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+CHRONOS_PROPERTIES = {
+    "Category": "select",
+    "Priority": "select",
+    "Status": "select",
+    "Estimated Time": "number",
+    "Actual Time": "number",
+    "User Rating": "number",
+    "Created": "created_time",
+    "Due Date": "date",
+    "Scheduled Time": "date",
+    "Description": "rich_text",
+    "Tags": "multi_select",
+    "Chronos Ref": "rich_text",
+}
+
+# Variantes de schema encontradas em databases reais
+SCHEMA_VARIANTS = {
+    "full": dict(CHRONOS_PROPERTIES, Name="title"),
+    "renamed_title": dict(CHRONOS_PROPERTIES, Tarefa="title"),
+    "minimal": {"Name": "title", "Status": "select", "Scheduled Time": "date"},
+}
+
+EMPTY_VALUES = {
+    "title": list, "rich_text": list, "multi_select": list,
+    "select": lambda: None, "number": lambda: None, "date": lambda: None,
+}
+
+class LatencyModel:
+    """Distribuição de latência: 'fixed:MS', 'uniform:MIN,MAX' ou 'lognormal:MEDIANA,SIGMA'"""
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p] or [0.0]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Distribuição de latência desconhecida: {spec}")
+
+    def sample(self) -> float:
+        """Latência em segundos"""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = random.uniform(self.params[0], self.params[1])
+        else:
+            median, sigma = self.params[0], self.params[1] if len(self.params) > 1 else 0.5
+            ms = random.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        return max(ms, 0.0) / 1000
+
+class FakeNotionState:
+    """Estado em memória: databases, páginas e contadores"""
+
+    def __init__(self, schema_variant: str = "full"):
+        self.lock = threading.Lock()
+        self.databases: Dict[str, Dict] = {}
+        self.pages: Dict[str, Dict] = {}
+        self.requests = 0
+        self.injected_errors = 0
+        self.default_database_id = self.create_database(schema_variant)
+
+    def create_database(self, schema_variant: str = "full") -> str:
+        database_id = uuid.uuid4().hex
+        schema = {
+            name: {"id": uuid.uuid4().hex[:4], "name": name, "type": prop_type, prop_type: {}}
+            for name, prop_type in SCHEMA_VARIANTS[schema_variant].items()
+        }
+        now = _now_iso()
+        with self.lock:
+            self.databases[database_id] = {
+                "object": "database", "id": database_id,
+                "title": [{"text": {"content": f"Chronos Fake ({schema_variant})"}}],
+                "created_time": now, "last_edited_time": now,
+                "properties": schema, "page_ids": []
+            }
+        return database_id
+
+    def seed_pages(self, database_id: str, count: int):
+        """Cria páginas sintéticas espalhadas pelos últimos 30 dias"""
+        schema = self.databases[database_id]["properties"]
+        title_prop = next(name for name, info in schema.items() if info["type"] == "title")
+        base = datetime.now(timezone.utc)
+        for i in range(count):
+            created = base - timedelta(minutes=random.randint(0, 30 * 24 * 60))
+            scheduled = created + timedelta(hours=random.randint(1, 72))
+            properties = {
+                title_prop: {"title": [{"text": {"content": f"Tarefa sintética {i}"}}]},
+                "Category": {"select": {"name": random.choice(["Development", "Meetings", "Research", "Planning"])}},
+                "Priority": {"select": {"name": random.choice(["Baixa", "Média", "Alta", "Urgente"])}},
+                "Status": {"select": {"name": random.choice(["Pendente", "Concluído"])}},
+                "Estimated Time": {"number": random.choice([15, 30, 60, 90, 120])},
+                "Scheduled Time": {"date": {"start": scheduled.isoformat()}},
+            }
+            self.create_page(database_id, {k: v for k, v in properties.items() if k in schema},
+                             created_time=created.isoformat())
+
+    def create_page(self, database_id: str, properties: Dict, created_time: Optional[str] = None) -> Dict:
+        now = created_time or _now_iso()
+        page = {
+            "object": "page", "id": str(uuid.uuid4()), "parent": {"database_id": database_id},
+            "created_time": now, "last_edited_time": now, "archived": False,
+            "properties": properties
+        }
+        with self.lock:
+            self.pages[page["id"]] = page
+            self.databases[database_id]["page_ids"].append(page["id"])
+        return page
+
+    def render_page(self, page: Dict) -> Dict:
+        """Página no formato da API: todas as propriedades do schema, vazias quando ausentes"""
+        schema = self.databases[page["parent"]["database_id"]]["properties"]
+        properties = {}
+        for name, info in schema.items():
+            prop_type = info["type"]
+            if prop_type == "created_time":
+                value = page["created_time"]
+            elif name in page["properties"]:
+                value = page["properties"][name].get(prop_type)
+            else:
+                value = EMPTY_VALUES.get(prop_type, lambda: None)()
+            properties[name] = {"id": info["id"], "type": prop_type, prop_type: value}
+        return dict(page, properties=properties)
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _compare(value: Optional[str], condition: Dict) -> bool:
+    current = _parse_time(value)
+    for op, target in condition.items():
+        if op == "is_empty":
+            return current is None
+        if op == "is_not_empty":
+            return current is not None
+        expected = _parse_time(target)
+        if current is None or expected is None:
+            return False
+        if op == "on_or_after" and not current >= expected:
+            return False
+        if op == "after" and not current > expected:
+            return False
+        if op == "before" and not current < expected:
+            return False
+        if op == "on_or_before" and not current <= expected:
+            return False
+        if op == "equals" and current != expected:
+            return False
+    return True
+
+def _matches(page: Dict, condition: Optional[Dict]) -> bool:
+    """Avaliação simplificada dos filtros usados pelo Chronos"""
+    if not condition:
+        return True
+    if "and" in condition:
+        return all(_matches(page, c) for c in condition["and"])
+    if "or" in condition:
+        return any(_matches(page, c) for c in condition["or"])
+    if "timestamp" in condition:
+        timestamp = condition["timestamp"]
+        return _compare(page.get(timestamp), condition.get(timestamp, {}))
+
+    prop = page["properties"].get(condition.get("property"), {})
+    for key in ("date", "created_time", "last_edited_time"):
+        if key in condition:
+            value = prop.get("created_time") if prop.get("type") == "created_time" else (prop.get("date") or {}).get("start")
+            return _compare(value, condition[key])
+    if "select" in condition:
+        selected = (prop.get("select") or {}).get("name")
+        return selected == condition["select"].get("equals")
+    if "rich_text" in condition:
+        text = "".join(item.get("text", {}).get("content", "") for item in prop.get("rich_text") or [])
+        return text == condition["rich_text"].get("equals")
+    return True
+
+def _sort_key(sort: Dict):
+    def key(page: Dict):
+        if "timestamp" in sort:
+            return page.get(sort["timestamp"]) or ""
+        prop = page["properties"].get(sort.get("property"), {})
+        if prop.get("type") == "created_time":
+            return prop.get("created_time") or ""
+        if prop.get("type") == "date":
+            return (prop.get("date") or {}).get("start") or ""
+        return str(prop.get(prop.get("type")) or "")
+    return key
+
+class FakeNotionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeNotion/1.0"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def _handle(self, method: str):
+        server = self.server
+        state = server.state
+        with state.lock:
+            state.requests += 1
+            forced_429 = server.force_429 > 0
+            if forced_429:
+                server.force_429 -= 1
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        time.sleep(server.latency.sample())
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._error(401, "unauthorized", "API token is invalid.")
+
+        roll = random.random()
+        if forced_429 or roll < server.error_429:
+            with state.lock:
+                state.injected_errors += 1
+            return self._error(429, "rate_limited", "Rate limited", {"Retry-After": str(server.retry_after)})
+        if roll < server.error_429 + server.error_5xx:
+            with state.lock:
+                state.injected_errors += 1
+            status = random.choice([500, 502, 503])
+            return self._error(status, "service_unavailable", "Injected server error")
+
+        path = self.path.split("?")[0].rstrip("/")
+        routes = [
+            ("GET", r"^/v1/users/me$", self._get_me),
+            ("GET", r"^/v1/databases/([^/]+)$", self._get_database),
+            ("PATCH", r"^/v1/databases/([^/]+)$", self._patch_database),
+            ("POST", r"^/v1/databases/([^/]+)/query$", self._query_database),
+            ("POST", r"^/v1/pages$", self._create_page),
+            ("GET", r"^/v1/pages/([^/]+)$", self._get_page),
+            ("PATCH", r"^/v1/pages/([^/]+)$", self._patch_page),
+        ]
+        for route_method, pattern, handler in routes:
+            match = re.match(pattern, path)
+            if match and route_method == method:
+                return handler(body, *match.groups())
+        return self._error(404, "object_not_found", f"No route for {method} {path}")
+
+    # === ROTAS ===
+
+    def _get_me(self, body: Dict):
+        self._send(200, {"object": "user", "id": "fake-bot", "name": "Fake Notion", "type": "bot"})
+
+    def _get_database(self, body: Dict, database_id: str):
+        database = self._database(database_id)
+        if database:
+            self._send(200, {k: v for k, v in database.items() if k != "page_ids"})
+
+    def _patch_database(self, body: Dict, database_id: str):
+        database = self._database(database_id)
+        if not database:
+            return
+        state = self.server.state
+        with state.lock:
+            for name, config in body.get("properties", {}).items():
+                prop_type = next(iter(config))
+                database["properties"][name] = {"id": uuid.uuid4().hex[:4], "name": name,
+                                                "type": prop_type, prop_type: config[prop_type]}
+            database["last_edited_time"] = _now_iso()
+        self._get_database(body, database_id)
+
+    def _query_database(self, body: Dict, database_id: str):
+        database = self._database(database_id)
+        if not database:
+            return
+        state = self.server.state
+        with state.lock:
+            pages = [state.render_page(state.pages[pid]) for pid in database["page_ids"]
+                     if not state.pages[pid]["archived"]]
+
+        pages = [page for page in pages if _matches(page, body.get("filter"))]
+        for sort in reversed(body.get("sorts", [])):
+            pages.sort(key=_sort_key(sort), reverse=sort.get("direction") == "descending")
+
+        page_size = max(1, min(int(body.get("page_size", 100)), 100))
+        start = int(body.get("start_cursor") or 0)
+        results = pages[start:start + page_size]
+        has_more = start + page_size < len(pages)
+        self._send(200, {
+            "object": "list", "results": results, "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None
+        })
+
+    def _create_page(self, body: Dict):
+        database_id = body.get("parent", {}).get("database_id")
+        database = self._database(database_id)
+        if not database:
+            return
+        invalid = self._invalid_properties(database, body.get("properties", {}))
+        if invalid:
+            return self._error(400, "validation_error", f"{invalid} is not a property that exists.")
+        page = self.server.state.create_page(database_id, body.get("properties", {}))
+        self._send(200, self.server.state.render_page(page))
+
+    def _get_page(self, body: Dict, page_id: str):
+        state = self.server.state
+        page = state.pages.get(page_id)
+        if not page:
+            return self._error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+        self._send(200, state.render_page(page))
+
+    def _patch_page(self, body: Dict, page_id: str):
+        state = self.server.state
+        page = state.pages.get(page_id)
+        if not page:
+            return self._error(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+        database = state.databases[page["parent"]["database_id"]]
+        invalid = self._invalid_properties(database, body.get("properties", {}))
+        if invalid:
+            return self._error(400, "validation_error", f"{invalid} is not a property that exists.")
+        with state.lock:
+            page["properties"].update(body.get("properties", {}))
+            page["archived"] = body.get("archived", page["archived"])
+            page["last_edited_time"] = _now_iso()
+        self._send(200, state.render_page(page))
+
+    # === AUXILIARES ===
+
+    def _database(self, database_id: Optional[str]) -> Optional[Dict]:
+        database = self.server.state.databases.get((database_id or "").replace("-", ""))
+        if not database:
+            self._error(404, "object_not_found", f"Could not find database with ID: {database_id}.")
+        return database
+
+    @staticmethod
+    def _invalid_properties(database: Dict, properties: Dict) -> Optional[str]:
+        for name in properties:
+            if name not in database["properties"]:
+                return name
+        return None
+
+    def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, code: str, message: str, headers: Optional[Dict] = None):
+        self._send(status, {"object": "error", "status": status, "code": code, "message": message}, headers)
+
+class FakeNotionServer(ThreadingHTTPServer):
+    """Fake da Notion API rodando em uma thread (use como context manager)"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 error_429: float = 0.0, error_5xx: float = 0.0, retry_after: float = 1.0,
+                 schema_variant: str = "full", seed_pages: int = 0, verbose: bool = False):
+        super().__init__((host, port), FakeNotionHandler)
+        self.latency = LatencyModel(latency)
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.retry_after = retry_after
+        self.force_429 = 0  # Próximas N requisições respondem 429 (determinístico, para testes)
+        self.verbose = verbose
+        self.state = FakeNotionState(schema_variant)
+        if seed_pages:
+            self.state.seed_pages(self.state.default_database_id, seed_pages)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    @property
+    def database_id(self) -> str:
+        return self.state.default_database_id
+
+    def start(self) -> "FakeNotionServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-notion", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeNotionServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor fake da Notion API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS | uniform:MIN,MAX | lognormal:MEDIANA,SIGMA")
+    parser.add_argument("--error-429", type=float, default=0.0, help="probabilidade de responder 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="probabilidade de responder 5xx")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--schema", choices=sorted(SCHEMA_VARIANTS), default="full")
+    parser.add_argument("--seed-pages", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeNotionServer(args.host, args.port, args.latency, args.error_429, args.error_5xx,
+                              args.retry_after, args.schema, args.seed_pages, args.verbose)
+    print("🧪 Fake Notion API rodando")
+    print(f"   NOTION_BASE_URL={server.base_url}")
+    print(f"   DATABASE_ID={server.database_id}")
+    print(f"   Schema: {args.schema} | Latência: {args.latency} | 429: {args.error_429:.0%} | 5xx: {args.error_5xx:.0%}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Fake Notion API encerrada")
+        server.server_close()
@@ -6,9 +6,13 @@ Adiciona todas as propriedades necessárias para o Chronos AI
 
 import os
 import sys
-import requests
 import json
 
+# Adiciona o diretório do projeto ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integrations.notion_transport import get_transport
+
 # Tenta importar com fallback
 try:
     from dotenv import load_dotenv
@@ -26,11 +30,7 @@ def setup_notion_database():
         print("❌ NOTION_TOKEN ou DATABASE_ID não configurados")
         return False
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "Notion-Version": "2022-06-28"
-    }
+    transport = get_transport(token)
     
     print("🚀 Configurando Database do Notion para Chronos AI")
     print("=" * 60)
@@ -40,7 +40,7 @@ def setup_notion_database():
     # Primeiro, vamos verificar as propriedades existentes
     try:
         print("🔍 Verificando propriedades existentes...")
-        response = requests.get(f"https://api.notion.com/v1/databases/{database_id}", headers=headers)
+        response = transport.get(f"databases/{database_id}")
         
         if response.status_code != 200:
             print(f"❌ Erro ao acessar database: {response.status_code}")
@@ -149,6 +149,10 @@ def setup_notion_database():
                     {"name": "refactor", "color": "brown"}
                 ]
             }
+        },
+        # Referência local da tarefa: permite achar a página antes de reenviar uma criação
+        "Chronos Ref": {
+            "rich_text": {}
         }
     }
     
@@ -181,9 +185,8 @@ def setup_notion_database():
     
     try:
         print("🔄 Enviando configuração para o Notion...")
-        response = requests.patch(
-            f"https://api.notion.com/v1/databases/{database_id}",
-            headers=headers,
+        response = transport.patch(
+            f"databases/{database_id}",
             json=update_payload
         )
         
@@ -200,12 +203,12 @@ def setup_notion_database():
                 print(f"   ✅ {prop_name}: {prop_type}")
             
             print(f"\n🎉 CONFIGURAÇÃO COMPLETA!")
-            print(f"📊 Total de propriedades: {len(properties)}/11")
+            print(f"📊 Total de propriedades: {len(properties)}/12")
             print(f"💡 O Chronos AI agora deve funcionar perfeitamente!")
             
             # Teste rápido de criação de tarefa
             print(f"\n🧪 Testando criação de tarefa exemplo...")
-            test_task_creation(headers, database_id, title_property_name)
+            test_task_creation(transport, database_id, title_property_name)
             
             return True
             
@@ -235,7 +238,7 @@ def setup_notion_database():
         print(f"❌ Erro na configuração: {e}")
         return False
 
-def test_task_creation(headers, database_id, title_property_name):
+def test_task_creation(transport, database_id, title_property_name):
     """Testa criação de uma tarefa exemplo"""
     
     # Usar o nome real da propriedade title
@@ -272,9 +275,8 @@ def test_task_creation(headers, database_id, title_property_name):
     }
     
     try:
-        response = requests.post(
-            "https://api.notion.com/v1/pages",
-            headers=headers,
+        response = transport.post(
+            "pages",
             json=sample_task
         )
         
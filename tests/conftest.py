@@ -0,0 +1,24 @@
+import uuid
+
+import pytest
+
+from integrations.circuit_breaker import CircuitBreaker
+from integrations.notion_client import NotionClient
+from scripts.fake_notion_server import FakeNotionServer
+
+
+@pytest.fixture
+def fake_notion():
+    with FakeNotionServer() as server:
+        yield server
+
+
+@pytest.fixture
+def notion_client(fake_notion, monkeypatch):
+    """NotionClient apontado para o fake, sem limite de taxa e com breaker próprio"""
+    monkeypatch.setenv('NOTION_BASE_URL', fake_notion.base_url)
+    monkeypatch.setenv('NOTION_RATE_LIMIT', '1000')
+    client = NotionClient(f"fake-{uuid.uuid4().hex[:8]}", fake_notion.database_id)
+    client.transport.breaker = CircuitBreaker('notion-test', failure_threshold=100)
+    yield client
+    client.close()
@@ -0,0 +1,41 @@
+import sqlite3
+
+from integrations.ai_cache import SuggestionCache
+
+TASK = {'category': 'Development', 'priority': 'Alta', 'estimated_time': 60}
+
+
+def stored_hits(cache):
+    with sqlite3.connect(cache.db_path) as conn:
+        return conn.execute('SELECT hits FROM ai_response_cache').fetchone()[0]
+
+
+def test_hits_are_written_in_batches(tmp_path):
+    cache = SuggestionCache(str(tmp_path / "chronos.db"), flush_every=3)
+    cache.put(TASK, {'scheduled_datetime': '2026-10-17T09:00:00'})
+
+    cache.get(TASK)
+    cache.get(TASK)
+    assert stored_hits(cache) == 0
+
+    cache.get(TASK)
+    assert stored_hits(cache) == 3
+
+    cache.get(TASK)
+    cache.flush()
+    assert stored_hits(cache) == 4
+
+
+def test_put_keeps_recency_of_other_entries(tmp_path):
+    db_path = str(tmp_path / "chronos.db")
+    other = dict(TASK, category='Meetings')
+    cache = SuggestionCache(db_path)
+    cache.put(TASK, {'scheduled_datetime': '2026-10-17T09:00:00'})
+    cache.put(other, {'scheduled_datetime': '2026-10-17T10:00:00'})
+
+    cache.get(TASK)  # Só em memória até o próximo put
+    cache.put(dict(TASK, category='Research'), {'scheduled_datetime': '2026-10-17T11:00:00'})
+
+    reloaded = SuggestionCache(db_path, max_entries=2)
+    assert reloaded.contains(TASK)
+    assert not reloaded.contains(other)
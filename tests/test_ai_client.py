@@ -0,0 +1,93 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from integrations.ai_client import AIClient
+from integrations.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+TASK = {'title': 'Revisar PR', 'category': 'Development', 'priority': 'Alta', 'estimated_time': 60}
+
+
+class StallingHandler(BaseHTTPRequestHandler):
+    """Responde 200 com os headers do SSE e trava antes do primeiro evento"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.flush()
+        time.sleep(1)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stalling_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_ai_client(monkeypatch, tmp_path):
+    """AIClient em modo produção sem cache, lote nem threads de fundo (banco em tmp_path)"""
+    monkeypatch.chdir(tmp_path)
+    for name, value in {'AI_DEV_MODE': 'false', 'AI_CACHE': 'false', 'AI_BATCH': 'false',
+                        'AI_WARMUP': 'false'}.items():
+        monkeypatch.setenv(name, value)
+
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        return AIClient()
+    return make
+
+
+def test_hedge_cancels_queued_calls_and_rejects_when_full(make_ai_client):
+    client = make_ai_client(AI_HEDGE_WORKERS=1, AI_HEDGE_MAX_PENDING=2)
+    release = threading.Event()
+    started = []
+
+    def slow_model(task_data, user_patterns, context):
+        started.append(task_data['title'])
+        release.wait(5)
+        return None
+    client._suggest_from_model = slow_model
+
+    tasks = [dict(TASK, title=f'tarefa {i}') for i in range(3)]
+    suggestions = client.generate_hedged_suggestions(tasks, {}, {}, budget=0.05)
+
+    assert [s['source'] for s in suggestions] == ['heuristic'] * 3
+    stats = client.get_hedge_stats()
+    assert stats['rejected'] == 1   # A terceira não coube na fila
+    assert stats['cancelled'] == 1  # A segunda ainda esperava um worker
+    assert stats['pending'] == 1
+
+    release.set()
+    client._hedge_pool.shutdown(wait=True)
+    assert started == ['tarefa 0']
+    assert client.get_hedge_stats()['pending'] == 0
+
+
+def test_stream_stalled_after_headers_opens_breaker(make_ai_client, stalling_server):
+    client = make_ai_client(OPENAI_BASE_URL=stalling_server, AI_STREAM='true', AI_TIMEOUT=0.2)
+    endpoint = client.router.endpoints[0]
+    endpoint.breaker = CircuitBreaker('localai-test', failure_threshold=2, cooldown=0.0)
+    client.router.max_failures = 100  # Isola o breaker da ejeção do roteador
+
+    assert client._call_openai_local("Tarefa: teste") is None
+    assert endpoint.breaker.state == CLOSED
+    assert client._call_openai_local("Tarefa: teste") is None
+    assert endpoint.breaker.state == OPEN
+
+    # A sonda do meio-aberto também trava: o circuito reabre em vez de fechar nos headers
+    assert client._call_openai_local("Tarefa: teste") is None
+    assert endpoint.breaker.state == OPEN
+    assert endpoint.breaker.stats['successes'] == 0
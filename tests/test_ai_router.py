@@ -0,0 +1,33 @@
+from integrations.ai_router import EndpointRouter
+from integrations.circuit_breaker import CircuitBreaker
+
+
+def make_router(*urls):
+    router = EndpointRouter(list(urls), eject_seconds=60, max_failures=1)
+    for endpoint in router.endpoints:
+        endpoint.breaker = CircuitBreaker(f"test:{endpoint.base_url}", failure_threshold=1, cooldown=60)
+    return router
+
+
+def test_all_ejected_returns_none():
+    router = make_router("http://a/v1", "http://b/v1")
+    for endpoint in router.endpoints:
+        router.release(router.acquire(endpoint), 0.1, success=False)
+
+    assert router.acquire() is None
+    assert not router.has_available()
+
+
+def test_open_breaker_only_removes_its_endpoint():
+    router = make_router("http://a/v1", "http://b/v1")
+    a, b = router.endpoints
+    a.breaker.record_failure()
+
+    for _ in range(3):
+        endpoint = router.acquire()
+        assert endpoint is b
+        router.release(endpoint, 0.1, success=True)
+    assert b.breaker.state == 'closed'
+
+    b.breaker.record_failure()
+    assert router.acquire() is None
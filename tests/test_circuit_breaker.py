@@ -0,0 +1,60 @@
+import pytest
+import requests
+
+from integrations.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from integrations.notion_transport import NotionTransport
+
+
+class RaisingSession:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def request(self, *args, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+class OkSession:
+    def request(self, *args, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+
+def make_transport(session):
+    transport = NotionTransport("token", base_url="http://notion.test", rate_per_sec=1000, max_retries=0)
+    transport.session = session
+    transport.breaker = CircuitBreaker('notion-test', failure_threshold=1, cooldown=0.0)
+    return transport
+
+
+def test_probe_reopens_on_any_exception():
+    transport = make_transport(RaisingSession(requests.exceptions.Timeout()))
+    with pytest.raises(requests.exceptions.Timeout):
+        transport.get("pages/x")
+    assert transport.breaker.state == OPEN
+
+    # Cooldown acabou: a próxima chamada é a sonda do meio-aberto e falha com erro não-HTTP
+    transport.session = RaisingSession(requests.exceptions.InvalidURL())
+    with pytest.raises(requests.exceptions.InvalidURL):
+        transport.get("pages/x")
+    assert transport.breaker.state == OPEN
+
+    # Sem a sonda presa, o breaker volta a deixar uma chamada passar e fecha com sucesso
+    transport.session = OkSession()
+    assert transport.get("pages/x").status_code == 200
+    assert transport.breaker.state == CLOSED
+
+
+def test_half_open_rejects_beyond_probe_budget():
+    breaker = CircuitBreaker('probe-test', failure_threshold=1, cooldown=0.0)
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
@@ -0,0 +1,77 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def create_scheduled(client, title, scheduled):
+    client.create_task({'title': title}, {'scheduled_datetime': scheduled.isoformat()})
+
+
+def test_day_filter_uses_local_day_bounds(fake_notion, notion_client):
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    # Início e fim do dia local expressos em UTC: os dois pertencem ao dia
+    create_scheduled(notion_client, 'first minute', day.astimezone(timezone.utc))
+    create_scheduled(notion_client, 'last minute', (day + timedelta(hours=23, minutes=59)).astimezone(timezone.utc))
+    create_scheduled(notion_client, 'next day', (day + timedelta(days=1)).astimezone(timezone.utc))
+
+    titles = {task['title'] for task in notion_client.get_tasks_between(day, day + timedelta(days=1))}
+
+    assert titles == {'first minute', 'last minute'}
+
+
+def test_iter_tasks_follows_cursor_across_pages(fake_notion, notion_client):
+    fake_notion.state.seed_pages(fake_notion.database_id, 25)
+
+    tasks = list(notion_client.iter_tasks(page_size=10, query={}))
+
+    assert len({task['id'] for task in tasks}) == 25
+    assert notion_client.transport.stats()['POST /databases/{id}/query']['calls'] == 3
+
+
+def test_rate_limited_request_waits_retry_after(fake_notion, notion_client):
+    notion_client._get_existing_properties()  # O 429 vai para o POST, não para o schema
+    fake_notion.force_429 = 1
+    fake_notion.retry_after = 0.3
+
+    start = time.monotonic()
+    task_id = notion_client.create_task({'title': 'throttled'}, {})
+
+    assert task_id in fake_notion.state.pages
+    assert time.monotonic() - start >= 0.3
+    assert notion_client.transport.stats()['POST /pages']['retries'] == 1
+
+
+def test_validation_error_invalidates_cached_schema(fake_notion, notion_client):
+    page_id = notion_client.create_task({'title': 'rated'}, {})
+    notion_client._get_existing_properties()
+    # A propriedade some do database depois de o schema estar em cache
+    del fake_notion.state.databases[fake_notion.database_id]['properties']['User Rating']
+
+    assert notion_client.update_task(page_id, {'feedback_rating': 5}) is False
+    assert notion_client.update_task(page_id, {'feedback_rating': 5, 'status': 'Concluído'}) is True
+    assert fake_notion.state.pages[page_id]['properties']['Status'] == {'select': {'name': 'Concluído'}}
+
+
+def test_create_tasks_returns_results_in_order(fake_notion, notion_client):
+    batch = [({'title': f'bulk {i}', 'priority': 'Alta'}, {}) for i in range(5)]
+
+    results = notion_client.create_tasks(batch)
+
+    assert [result['index'] for result in results] == list(range(5))
+    assert all(result['success'] for result in results)
+    titles = [fake_notion.state.pages[result['task_id']]['properties']['Name']['title'][0]['text']['content']
+              for result in results]
+    assert titles == [f'bulk {i}' for i in range(5)]
+
+
+def test_coalescer_sends_last_write_once(fake_notion, notion_client):
+    page_id = notion_client.create_task({'title': 'coalesced'}, {})
+    notion_client.updates.window = 60  # Só o flush envia
+
+    notion_client.queue_update(page_id, {'status': 'Em Progresso', 'actual_time': 10})
+    notion_client.queue_update(page_id, {'status': 'Concluído'})
+    notion_client.updates.flush()
+
+    properties = fake_notion.state.pages[page_id]['properties']
+    assert properties['Status'] == {'select': {'name': 'Concluído'}}
+    assert properties['Actual Time'] == {'number': 10}
+    assert notion_client.transport.stats()['PATCH /pages/{id}']['calls'] == 1
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+from integrations.notion_mirror import NotionMirror
+from learning.pattern_analyzer import PatternAnalyzer
+
+
+class StubNotion:
+    database_id = 'db-test'
+
+
+def utc_iso(moment):
+    return moment.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def test_history_reads_recent_tasks_from_mirror(tmp_path):
+    mirror = NotionMirror(StubNotion(), str(tmp_path / "chronos.db"))
+    now = datetime.now()
+    mirror.upsert_tasks([
+        {'id': 'recent', 'created_date': utc_iso(now - timedelta(days=2))},
+        {'id': 'old', 'created_date': utc_iso(now - timedelta(days=40))},
+    ])
+
+    assert [task['id'] for task in mirror.get_task_history(days_back=30)] == ['recent']
+
+
+def test_analyzer_uses_mirror_history(tmp_path):
+    db_path = str(tmp_path / "chronos.db")
+    mirror = NotionMirror(StubNotion(), db_path)
+    created = utc_iso(datetime.now() - timedelta(days=1))
+    mirror.upsert_tasks([
+        {'id': f'task-{i}', 'category': 'Development', 'status': 'Concluído', 'estimated_time': 60,
+         'actual_time': 30, 'created_date': created, 'scheduled_time': '2026-10-14T09:00:00'}
+        for i in range(3)
+    ])
+
+    analyzer = PatternAnalyzer(db_path, history_source=mirror.get_task_history)
+    patterns = analyzer.refresh_patterns()
+
+    assert patterns['category_efficiency']['Development']['sample_size'] == 3
+    assert patterns['hourly_productivity']['9']['efficiency'] == 2.0
@@ -0,0 +1,43 @@
+import sqlite3
+
+from integrations.notion_outbox import NotionOutbox
+from scripts.fake_notion_server import LatencyModel
+
+
+def test_ambiguous_create_is_looked_up_instead_of_duplicated(fake_notion, notion_client, tmp_path):
+    outbox = NotionOutbox(notion_client, str(tmp_path / "chronos.db"))
+    outbox.enqueue_create('task_ref1', {'title': 'A'}, {'scheduled_datetime': '2026-10-17T09:00:00'})
+
+    notion_client._get_existing_properties()  # schema em cache antes de o fake ficar lento
+    # A página é criada, mas a resposta chega depois do timeout do cliente
+    fake_notion.latency = LatencyModel("fixed:300")
+    notion_client.transport.timeout = 0.1
+    assert outbox.drain_once() == 0
+    assert outbox.get_status('task_ref1')['status'] == 'pending'
+
+    fake_notion.latency = LatencyModel("fixed:0")
+    notion_client.transport.timeout = 5
+    with sqlite3.connect(outbox.db_path) as conn:
+        conn.execute("UPDATE notion_outbox SET next_attempt_at = 0")  # sem esperar o backoff
+    assert outbox.drain_once() == 1
+
+    status = outbox.get_status('task_ref1')
+    assert status['status'] == 'done'
+    assert len(fake_notion.state.pages) == 1
+    assert status['notion_page_id'] in fake_notion.state.pages
+
+
+def test_drain_creates_page_before_sending_merged_updates(fake_notion, notion_client, tmp_path):
+    outbox = NotionOutbox(notion_client, str(tmp_path / "chronos.db"))
+    outbox.enqueue_create('task_ref1', {'title': 'A'}, {'scheduled_datetime': '2026-10-17T09:00:00'})
+    outbox.enqueue_update('task_ref1', {'status': 'Em Progresso', 'actual_time': 20})
+    outbox.enqueue_update('task_ref1', {'status': 'Concluído'})
+
+    assert outbox.drain_once() == 3
+
+    page_id = outbox.get_status('task_ref1')['notion_page_id']
+    properties = fake_notion.state.pages[page_id]['properties']
+    assert properties['Status'] == {'select': {'name': 'Concluído'}}
+    assert properties['Actual Time'] == {'number': 20}
+    assert notion_client.transport.stats()['PATCH /pages/{id}']['calls'] == 1
+    assert outbox.pending_count() == 0
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.context_cache import ContextSnapshotCache
+from core.scheduler import ChronosCore
+from core.slot_engine import parse_local_datetime
+from integrations.notion_mirror import NotionMirror
+from integrations.notion_outbox import NotionOutbox
+
+
+class StubNotion:
+    database_id = 'db-test'
+
+
+@pytest.fixture
+def core(tmp_path):
+    # Sem __init__: nada de threads de sync, transporte HTTP ou cliente de IA
+    chronos = ChronosCore.__new__(ChronosCore)
+    db_path = str(tmp_path / "chronos.db")
+    chronos.config = {'notion_token': 'token', 'database_id': StubNotion.database_id}
+    chronos.mirror = NotionMirror(StubNotion(), db_path)
+    chronos.outbox = NotionOutbox(StubNotion(), db_path)
+    chronos.workday = (8, 19)
+    chronos.horizon_days = 7
+    chronos.placement = 'earliest'
+    return chronos
+
+
+def tomorrow_at(hour):
+    return (datetime.now() + timedelta(days=1)).replace(hour=hour, minute=0, second=0, microsecond=0)
+
+
+def assert_no_overlap(suggestion, busy_start, minutes=60):
+    start = parse_local_datetime(suggestion['scheduled_datetime'])
+    busy_end = busy_start + timedelta(minutes=minutes)
+    assert start + timedelta(minutes=minutes) <= busy_start or start >= busy_end
+
+
+def test_suggestion_avoids_future_day_task(core):
+    booked = tomorrow_at(9)
+    core.mirror.upsert_tasks([{'id': 'task-a', 'scheduled_time': booked.isoformat(), 'estimated_time': 60}])
+
+    suggestion = {'scheduled_datetime': booked.isoformat(), 'duration_minutes': 60}
+    placed = core._optimize_suggestion(suggestion, {'existing_tasks': []}, {'estimated_time': 60}, {})
+
+    assert placed['scheduled_datetime'] != booked.isoformat()
+    assert_no_overlap(placed, booked)
+
+
+def test_suggestion_avoids_create_still_in_outbox(core):
+    booked = tomorrow_at(10)
+    core.outbox.enqueue_create('task_a', {'title': 'A', 'estimated_time': 60},
+                               {'scheduled_datetime': booked.isoformat(), 'duration_minutes': 60})
+
+    suggestion = {'scheduled_datetime': booked.isoformat(), 'duration_minutes': 60}
+    placed = core._optimize_suggestion(suggestion, {'existing_tasks': []}, {'estimated_time': 60}, {})
+
+    assert_no_overlap(placed, booked)
+
+
+def test_scored_placement_avoids_future_day_task(core):
+    pytest.importorskip('numpy')
+    core.placement = 'scored'
+    booked = tomorrow_at(9)
+    core.mirror.upsert_tasks([
+        {'id': f'task-{hour}', 'scheduled_time': tomorrow_at(hour).isoformat(), 'estimated_time': 60}
+        for hour in range(9, 12)
+    ])
+
+    suggestion = {'scheduled_datetime': booked.isoformat(), 'duration_minutes': 60}
+    placed = core._optimize_suggestion(suggestion, {'existing_tasks': []},
+                                       {'category': 'Development', 'priority': 'Alta', 'estimated_time': 60}, {})
+
+    for hour in range(9, 12):
+        assert_no_overlap(placed, tomorrow_at(hour))
+    start = parse_local_datetime(placed['scheduled_datetime'])
+    assert core.workday[0] <= start.hour < core.workday[1]
+
+
+def test_batch_avoids_future_day_task(core):
+    booked = tomorrow_at(9)
+    core.mirror.upsert_tasks([{'id': 'task-a', 'scheduled_time': booked.isoformat(), 'estimated_time': 60}])
+
+    class StubAI:
+        def generate_hedged_suggestions(self, tasks, context, patterns):
+            return [{'scheduled_datetime': booked.isoformat(), 'duration_minutes': 60} for _ in tasks]
+
+    core.ai = StubAI()
+    core.session_id = 'chronos_test'
+    core.context_cache = ContextSnapshotCache(ttl=5)
+    core._stage_pool = ThreadPoolExecutor(max_workers=1)
+    core._context_snapshot = lambda: ({'existing_tasks': []}, {})
+
+    result = core.orchestrate_batch([{'title': 'B', 'estimated_time': 60}, {'title': 'C', 'estimated_time': 60}])
+
+    starts = [parse_local_datetime(item['suggestion']['scheduled_datetime']) for item in result['results']]
+    for item in result['results']:
+        assert_no_overlap(item['suggestion'], booked)
+    assert abs(starts[0] - starts[1]) >= timedelta(minutes=60)